@@ -0,0 +1,251 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+ALERTS_PATH = "data/alerts.sqlite"
+DEFAULT_USER = "local"
+HIGH_RISK = 70.0
+MAX_ALERTS = 10
+
+
+class _UserState:
+    __slots__ = ("count", "ewma", "ewvar", "total", "last_score", "last_time",
+                 "run", "run_started", "sustained", "alerts")
+
+    def __init__(self, values=None):
+        self.count = 0
+        self.ewma = 0.0
+        self.ewvar = 0.0
+        self.total = 0.0
+        self.last_score = None
+        self.last_time = None
+        self.run = 0                # consecutive scores at or above HIGH_RISK
+        self.run_started = None
+        self.sustained = False      # sustained alert raised for the current run
+        self.alerts = []            # latest MAX_ALERTS alerts, oldest first
+        for name, value in (values or {}).items():
+            if name in self.__slots__:
+                setattr(self, name, value)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RiskDetector:
+    """Streaming spike and sustained high-risk detection per user
+
+    Each user keeps an exponentially weighted mean and variance of their
+    scores plus the length of their current run at or above 70%. A score
+    well above the user's own average is a spike; a run that reaches
+    `sustained_runs` scores or `sustained_hours` is sustained risk. Every
+    update reads and writes one user's row in a SQLite file inside one
+    transaction, so the cost does not depend on history length or the
+    number of users, and Streamlit replicas and the API share the state.
+    Users with no score for `max_idle_days` are dropped by the next update.
+    """
+
+    def __init__(self, path=ALERTS_PATH, alpha=0.3, spike_points=20.0, spike_sigmas=2.5, min_history=3,
+                 sustained_runs=3, sustained_hours=48.0, max_idle_days=90.0):
+        self.path = path
+        self.alpha = alpha
+        self.spike_points = spike_points
+        self.spike_sigmas = spike_sigmas
+        self.min_history = min_history
+        self.sustained_runs = sustained_runs
+        self.sustained_hours = sustained_hours
+        self.max_idle_days = max_idle_days
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        db = sqlite3.connect(path, timeout=30)
+        try:
+            # Readers don't block the writer, and commits don't wait for a full fsync
+            db.execute("PRAGMA journal_mode=WAL")
+        finally:
+            db.close()
+        with self._transaction() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS users (user TEXT PRIMARY KEY, state TEXT, last_time REAL)")
+            db.execute("CREATE INDEX IF NOT EXISTS users_last_time ON users (last_time)")
+            db.execute("CREATE TABLE IF NOT EXISTS flagged (user TEXT PRIMARY KEY, kind TEXT, alert TEXT)")
+
+    @contextmanager
+    def _transaction(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            db.execute("PRAGMA synchronous=NORMAL")
+            # Take the write lock up front so two processes never interleave an update
+            db.execute("BEGIN IMMEDIATE")
+            yield db
+            db.execute("COMMIT")
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def _read(self, query, args=()):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            return db.execute(query, args).fetchall()
+        finally:
+            db.close()
+
+    def update(self, user, score, timestamp=None):
+        """Add one score for a user and return the alerts it raised"""
+        with self._transaction() as db:
+            row = db.execute("SELECT state FROM users WHERE user = ?", (user,)).fetchone()
+            state = _UserState(json.loads(row[0]) if row else None)
+            raised, cleared = self._apply(user, state, score, timestamp)
+            self._store(db, {user: state}, {user: raised[-1]} if raised else {}, [user] if cleared else [])
+        return raised
+
+    def _apply(self, user, state, score, timestamp=None):
+        """Update one user's state; (alerts raised, whether a sustained flag ends)"""
+        timestamp = time.time() if timestamp is None else timestamp
+        score = float(score)
+        raised = []
+        cleared = False
+
+        # Spike: far above this user's own recent average
+        if state.count >= self.min_history:
+            jump = score - state.ewma
+            spread = max(state.ewvar, 0.0) ** 0.5
+            if jump >= self.spike_points and jump >= self.spike_sigmas * spread:
+                raised.append(self._alert(user, state, "spike", score, timestamp,
+                                          f"Score jumped {jump:.1f} points above the recent average"))
+
+        # Sustained: a run of scores at or above the high-risk threshold
+        if score >= HIGH_RISK:
+            if state.run == 0:
+                state.run_started = timestamp
+            state.run += 1
+            hours = (timestamp - state.run_started) / 3600
+            if not state.sustained and (state.run >= self.sustained_runs or hours >= self.sustained_hours):
+                state.sustained = True
+                raised.append(self._alert(user, state, "sustained", score, timestamp,
+                                          f"{state.run} check-ins at or above {HIGH_RISK:.0f}% "
+                                          f"over {hours:.1f} hours"))
+        else:
+            cleared = True
+            state.run = 0
+            state.run_started = None
+            state.sustained = False
+
+        # Exponentially weighted mean and variance
+        if state.count == 0:
+            state.ewma = score
+        else:
+            diff = score - state.ewma
+            increment = self.alpha * diff
+            state.ewma += increment
+            state.ewvar = (1 - self.alpha) * (state.ewvar + diff * increment)
+        state.count += 1
+        state.total += score
+        state.last_score = score
+        state.last_time = timestamp
+        return raised, cleared
+
+    def _alert(self, user, state, kind, score, timestamp, message):
+        alert = {"user": user, "kind": kind, "score": score, "time": timestamp, "message": message}
+        state.alerts = (state.alerts + [alert])[-MAX_ALERTS:]
+        return alert
+
+    def _store(self, db, states, flags, cleared):
+        db.executemany("INSERT INTO users (user, state, last_time) VALUES (?, ?, ?) "
+                       "ON CONFLICT(user) DO UPDATE SET state = excluded.state, last_time = excluded.last_time",
+                       [(user, json.dumps(state.to_dict()), state.last_time) for user, state in states.items()])
+        # A sustained flag lasts until the run ends; a spike flag until the next alert
+        db.executemany("DELETE FROM flagged WHERE user = ? AND kind = 'sustained'",
+                       [(user,) for user in cleared if user not in flags])
+        db.executemany("INSERT INTO flagged (user, kind, alert) VALUES (?, ?, ?) "
+                       "ON CONFLICT(user) DO UPDATE SET kind = excluded.kind, alert = excluded.alert",
+                       [(user, alert["kind"], json.dumps(alert)) for user, alert in flags.items()])
+        if self.max_idle_days:
+            # Indexed range delete, so it costs nothing while no one is stale
+            cutoff = time.time() - self.max_idle_days * 86400
+            db.execute("DELETE FROM flagged WHERE user IN (SELECT user FROM users WHERE last_time < ?)", (cutoff,))
+            db.execute("DELETE FROM users WHERE last_time < ?", (cutoff,))
+
+    def status(self, user=DEFAULT_USER):
+        """Current state of one user, or None if they have no scores"""
+        rows = self._read("SELECT state FROM users WHERE user = ?", (user,))
+        if not rows:
+            return None
+        state = _UserState(json.loads(rows[0][0]))
+        return {
+            "count": state.count,
+            "ewma": state.ewma,
+            "ewstd": max(state.ewvar, 0.0) ** 0.5,
+            "mean": state.total / state.count,
+            "last_score": state.last_score,
+            "last_time": state.last_time,
+            "high_risk_run": state.run,
+            "sustained": state.sustained,
+            "alerts": list(state.alerts),
+        }
+
+    def flagged_users(self):
+        """{user: latest alert} for users currently flagged"""
+        return {user: json.loads(alert) for user, alert in self._read("SELECT user, alert FROM flagged")}
+
+    def update_many(self, items, if_empty=False):
+        """Apply (user, score, timestamp) items in order, in one transaction
+
+        With if_empty, nothing happens unless no user has state yet, checked
+        under the same write lock so only one process seeds the state.
+        """
+        states, flags, cleared = {}, {}, set()
+        with self._transaction() as db:
+            if if_empty and db.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+                return
+            for user, score, timestamp in items:
+                state = states.get(user)
+                if state is None:
+                    row = db.execute("SELECT state FROM users WHERE user = ?", (user,)).fetchone()
+                    state = states[user] = _UserState(json.loads(row[0]) if row else None)
+                raised, ended = self._apply(user, state, score, timestamp)
+                if raised:
+                    flags[user] = raised[-1]
+                    cleared.discard(user)
+                elif ended:
+                    cleared.add(user)
+                    if flags.get(user, {}).get("kind") == "sustained":
+                        del flags[user]
+            self._store(db, states, flags, cleared)
+
+
+def _history_scores(history_path):
+    """(DEFAULT_USER, score, timestamp) per existing history row, which has no user"""
+    import csv
+    from datetime import datetime
+
+    with open(history_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            try:
+                timestamp = datetime.strptime(row["date"], "%Y-%m-%d %H:%M:%S").timestamp()
+            except (KeyError, ValueError):
+                timestamp = None
+            try:
+                yield DEFAULT_USER, float(row["burnout_score"]), timestamp
+            except (KeyError, TypeError, ValueError):
+                continue
+
+
+_detector = None
+_detector_lock = threading.Lock()
+
+
+def get_detector(path=ALERTS_PATH, history_path="data/history.csv"):
+    """Shared RiskDetector over the SQLite state every process uses"""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            detector = RiskDetector(path)
+            # First run: seed the default user from the existing history, once
+            if os.path.exists(history_path):
+                detector.update_many(_history_scores(history_path), if_empty=True)
+            _detector = detector
+    return _detector
@@ -1,3 +1,5 @@
+import threading
+from collections import deque
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -57,4 +59,178 @@ def burnout_trend_chart(df):
                    color='#1E40AF')
     
     plt.tight_layout()
-    return fig
\ No newline at end of file
+    return fig
+
+class FactorGrid:
+    """Screen-hours x sleep-hours grid of burnout score sums and counts
+
+    One cell per slider step, so each history row lands in exactly one
+    cell. Rows can be added incrementally and the chart cost depends only
+    on the grid size, not on how many rows were added.
+    """
+    
+    def __init__(self, screen_max=16.0, sleep_max=12.0, step=0.5):
+        self.step = step
+        self.screen_max = screen_max
+        self.sleep_max = sleep_max
+        self.shape = (int(round(screen_max / step)) + 1, int(round(sleep_max / step)) + 1)
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        self.sums = np.zeros(self.shape)
+        self.counts = np.zeros(self.shape, dtype=np.int64)
+        self.rows = 0
+    
+    def add(self, screen_hours, sleep_hours, scores):
+        """Add a batch of rows (arrays of equal length)"""
+        screen_idx = np.clip(np.rint(np.asarray(screen_hours, dtype=float) / self.step), 0, self.shape[0] - 1).astype(int)
+        sleep_idx = np.clip(np.rint(np.asarray(sleep_hours, dtype=float) / self.step), 0, self.shape[1] - 1).astype(int)
+        scores = np.asarray(scores, dtype=float)
+        
+        np.add.at(self.sums, (screen_idx, sleep_idx), scores)
+        np.add.at(self.counts, (screen_idx, sleep_idx), 1)
+        self.rows += len(scores)
+    
+    def sync(self, df):
+        """Ingest only the rows of a history frame not counted yet"""
+        with self._lock:
+            # A shorter history means the file was replaced: start over
+            if len(df) < self.rows:
+                self.reset()
+            new_rows = df.iloc[self.rows:]
+            if len(new_rows):
+                self.add(new_rows['screen_hours'].values, new_rows['sleep_hours'].values,
+                         new_rows['burnout_score'].values)
+        return self
+    
+    def mean(self):
+        """Mean score per cell, NaN where a cell has no rows"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.counts > 0, self.sums / self.counts, np.nan)
+
+
+class HistoryStats:
+    """Running aggregates over history rows, fed only the new rows
+
+    Keeps what the live Analytics view shows: count, mean, min/max, the
+    latest rows, the most recent scores for the trend chart and a
+    FactorGrid, so each refresh costs as much as the rows it adds.
+    """
+    
+    def __init__(self, recent=200, latest_rows=10):
+        self.grid = FactorGrid()
+        self.recent_scores = deque(maxlen=recent)
+        self.latest_rows = deque(maxlen=latest_rows)
+        self.reset()
+    
+    def reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.peak = None
+        self.lowest = None
+        self.high_risk = 0
+        self.first_scores = []
+        self.grid.reset()
+        self.recent_scores.clear()
+        self.latest_rows.clear()
+    
+    def update(self, df):
+        """Add a frame of newly appended history rows"""
+        if df is None or len(df) == 0 or 'burnout_score' not in df.columns:
+            return self
+        
+        scores = df['burnout_score'].to_numpy(dtype=float)
+        self.count += len(scores)
+        self.total += scores.sum()
+        self.peak = scores.max() if self.peak is None else max(self.peak, scores.max())
+        self.lowest = scores.min() if self.lowest is None else min(self.lowest, scores.min())
+        self.high_risk += int((scores >= 70).sum())
+        self.first_scores = (self.first_scores + scores[:3].tolist())[:3]
+        self.recent_scores.extend(scores[-self.recent_scores.maxlen:])
+        self.latest_rows.extend(df.tail(self.latest_rows.maxlen).to_dict('records'))
+        
+        if 'screen_hours' in df.columns and 'sleep_hours' in df.columns:
+            self.grid.add(df['screen_hours'].values, df['sleep_hours'].values, scores)
+        return self
+    
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+    
+    @property
+    def latest(self):
+        return self.recent_scores[-1] if self.recent_scores else None
+
+
+def factor_heatmap_chart(grid):
+    """Heatmap of mean burnout score over screen time and sleep duration"""
+    fig, ax = plt.subplots(figsize=(8, 4))
+    
+    half = grid.step / 2
+    image = ax.imshow(
+        np.ma.masked_invalid(grid.mean().T),
+        origin='lower',
+        aspect='auto',
+        cmap='RdYlGn_r',
+        vmin=0,
+        vmax=100,
+        extent=(-half, grid.screen_max + half, -half, grid.sleep_max + half),
+        interpolation='nearest'
+    )
+    
+    ax.set_xlabel('Screen Time (hours)', fontsize=11)
+    ax.set_ylabel('Sleep Duration (hours)', fontsize=11)
+    ax.set_title(f'Screen Time vs Sleep Duration Impact ({grid.rows} records)', fontsize=12, pad=10)
+    ax.grid(True, alpha=0.3)
+    
+    cbar = plt.colorbar(image, ax=ax)
+    cbar.set_label('Mean Burnout Score %', fontsize=10)
+    
+    # Optimal zone
+    ax.axvline(x=6, color='green', linestyle=':', alpha=0.5)
+    ax.axhline(y=7, color='green', linestyle=':', alpha=0.5)
+    ax.text(6.1, 7.1, 'Optimal Zone', fontsize=9, color='green')
+    
+    plt.tight_layout()
+    return fig
+
+def what_if_chart(screen_grid, sleep_grid, risk, screen_hours=None, sleep_hours=None):
+    """Risk surface over screen time and sleep, with the 40%/70% boundaries"""
+    fig, ax = plt.subplots(figsize=(10, 5))
+    
+    step_x = screen_grid[1] - screen_grid[0] if len(screen_grid) > 1 else 1
+    step_y = sleep_grid[1] - sleep_grid[0] if len(sleep_grid) > 1 else 1
+    image = ax.imshow(
+        risk.T,
+        origin='lower',
+        aspect='auto',
+        cmap='RdYlGn_r',
+        vmin=0,
+        vmax=100,
+        extent=(screen_grid[0] - step_x / 2, screen_grid[-1] + step_x / 2,
+                sleep_grid[0] - step_y / 2, sleep_grid[-1] + step_y / 2),
+        interpolation='nearest'
+    )
+    
+    # Risk thresholds as contour lines
+    if risk.min() < 70 <= risk.max() or risk.min() < 40 <= risk.max():
+        contours = ax.contour(screen_grid, sleep_grid, risk.T, levels=[40, 70],
+                              colors=['orange', 'red'], linewidths=1.5, linestyles='--')
+        ax.clabel(contours, fmt='%d%%', fontsize=9)
+    
+    # Current slider position
+    if screen_hours is not None and sleep_hours is not None:
+        ax.scatter([screen_hours], [sleep_hours], s=150, c='white', edgecolors='black',
+                   linewidth=2, zorder=5, label='Your current input')
+        ax.legend(loc='upper right', framealpha=0.9)
+    
+    ax.set_title('What-if: Burnout Risk by Screen Time and Sleep', fontsize=14, fontweight='bold', pad=15)
+    ax.set_xlabel('Screen Time (hours)', fontsize=11)
+    ax.set_ylabel('Sleep Duration (hours)', fontsize=11)
+    
+    cbar = plt.colorbar(image, ax=ax)
+    cbar.set_label('Burnout Risk %', fontsize=10)
+    
+    plt.tight_layout()
+    return fig
@@ -0,0 +1,271 @@
+"""Headless JSON scoring API alongside the Streamlit app
+
+Endpoints:
+    GET  /health                     liveness and model status
+    POST /predict                    {"text", "screen", "sleep", "save"?, "user_id"?, "tier"?}
+    POST /predict/batch              {"items": [{"text", "screen", "sleep"}, ...]}
+    GET  /history?limit=50&offset=0  most recent saved records first
+    GET  /metrics                    scheduler queue depth, waits, rejections
+    GET  /alerts?user=<id>           flagged users, or one user's risk state
+
+Inference runs through an InferenceScheduler: single predictions are
+interactive and go ahead of batch requests. Overloaded requests get a
+503 {"error": "busy"} instead of waiting indefinitely. With "tier":
+"cascade" a lexical/behavioral scorer answers first and only requests near
+the 40%/70% thresholds reach BERT.
+
+Run with: python -m api --port 8502
+"""
+import argparse
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from scheduler import BATCH, INTERACTIVE, Busy, InferenceScheduler
+
+MAX_BODY_BYTES = 1024 * 1024
+MAX_BATCH_ITEMS = 256
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, detail=None):
+        super().__init__(message)
+        self.status = status
+        self.detail = detail
+
+
+def _parse_item(item):
+    if not isinstance(item, dict):
+        raise ApiError(400, "Each prediction must be a JSON object")
+    text = item.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise ApiError(400, "'text' must be a non-empty string")
+    try:
+        screen = float(item.get("screen", item.get("screen_hours")))
+        sleep = float(item.get("sleep", item.get("sleep_hours")))
+    except (TypeError, ValueError):
+        raise ApiError(400, "'screen' and 'sleep' must be numbers")
+    return text, screen, sleep
+
+
+def _deadline(payload):
+    deadline_ms = payload.get("deadline_ms") if isinstance(payload, dict) else None
+    if deadline_ms is None:
+        return None
+    try:
+        return max(float(deadline_ms), 0.0) / 1000
+    except (TypeError, ValueError):
+        raise ApiError(400, "'deadline_ms' must be a number")
+
+
+class ScoringService:
+    """Shared predictor behind a priority scheduler"""
+
+    def __init__(self, max_concurrency=2, scheduler=None):
+        self.scheduler = scheduler or InferenceScheduler(workers=max_concurrency)
+        self._cascade = None
+        self._cascade_lock = threading.Lock()
+
+    @property
+    def cascade(self):
+        with self._cascade_lock:
+            if self._cascade is None:
+                from cascade import CascadePredictor
+                from model import get_predictor
+                # Uses the fit saved by benchmarks/cascade_report.py, if any
+                self._cascade = CascadePredictor(get_predictor())
+            return self._cascade
+
+    def metrics(self):
+        metrics = self.scheduler.metrics()
+        if self._cascade is not None:
+            metrics["cascade"] = self._cascade.stats()
+        from utils import DURABILITY, get_history_writer
+        if DURABILITY != "sync":
+            metrics["history_writer"] = get_history_writer().metrics()
+        return metrics
+
+    def _run(self, priority, deadline, fn, *args):
+        try:
+            return self.scheduler.run(fn, *args, priority=priority, deadline=deadline)
+        except Busy as e:
+            raise ApiError(503, "busy", detail=str(e))
+
+    def predict(self, payload):
+        from model import predict_burnout
+        text, screen, sleep = _parse_item(payload)
+        deadline = _deadline(payload)
+        vectors = []
+
+        def full_predict(text, screen, sleep):
+            # Keep the text embedding so a saved record stays aligned with the EmbeddingStore
+            score, sentiment, vector = self._run(INTERACTIVE, deadline, predict_burnout, text, screen, sleep, True)
+            vectors.append(vector)
+            return score, sentiment
+
+        tier = payload.get("tier", "full")
+        if tier == "cascade":
+            score, sentiment = self.cascade.predict(text, screen, sleep, full_predict=full_predict)
+        elif tier == "full":
+            score, sentiment = full_predict(text, screen, sleep)
+        else:
+            raise ApiError(400, "'tier' must be 'full' or 'cascade'")
+
+        result = {"burnout_score": float(score), "emotional_score": float(sentiment)}
+        if payload.get("save"):
+            from utils import save_record
+            # A cascade answer without BERT has no vector; the store pads its row.
+            # The risk state updates in the background: read it from /alerts?user=
+            save_record(text, screen, sleep, score, vector=vectors[-1] if vectors else None,
+                        user_id=payload.get("user_id"))
+        return result
+
+    def predict_batch(self, payload):
+        from model import get_predictor
+        items = payload.get("items") if isinstance(payload, dict) else None
+        if not isinstance(items, list) or not items:
+            raise ApiError(400, "'items' must be a non-empty list")
+        if len(items) > MAX_BATCH_ITEMS:
+            raise ApiError(413, f"At most {MAX_BATCH_ITEMS} items per batch")
+
+        texts, screens, sleeps = zip(*(_parse_item(item) for item in items))
+        results = self._run(BATCH, _deadline(payload), get_predictor().predict_batch, texts, screens, sleeps)
+        return {"results": [
+            {"burnout_score": float(score), "emotional_score": float(sentiment)}
+            for score, sentiment in results
+        ]}
+
+    def alerts(self, query):
+        from alerts import get_detector
+        detector = get_detector()
+        if "user" in query:
+            status = detector.status(query["user"][0])
+            if status is None:
+                raise ApiError(404, "Unknown user")
+            return status
+        return {"flagged": detector.flagged_users()}
+
+    def history(self, query):
+        from utils import load_history
+        try:
+            limit = min(int(query.get("limit", ["50"])[0]), 1000)
+            offset = max(int(query.get("offset", ["0"])[0]), 0)
+        except ValueError:
+            raise ApiError(400, "'limit' and 'offset' must be integers")
+        if limit < 0:
+            raise ApiError(400, "'limit' must not be negative")
+
+        df = load_history()
+        if df is None or df.empty:
+            return {"total": 0, "records": []}
+
+        # Newest first, like the Analytics page
+        page = df.iloc[::-1].iloc[offset:offset + limit]
+        return {"total": len(df), "records": json.loads(page.to_json(orient="records"))}
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps client connections open between requests
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+    server_version = "BurnoutAPI/1.0"
+    service = None
+    verbose = False
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 503:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0 or length > MAX_BODY_BYTES:
+            # The body is not read, so the connection can't be reused
+            self.close_connection = True
+            if length < 0:
+                raise ApiError(400, "Invalid Content-Length")
+            raise ApiError(413, "Request body too large")
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            raise ApiError(400, "Body must be valid JSON")
+
+    def _dispatch(self, routes, read_body):
+        url = urlparse(self.path)
+        route = routes.get(url.path.rstrip("/") or "/")
+        try:
+            # Always drain the body so the kept-alive connection stays in sync
+            payload = self._read_json() if read_body else parse_qs(url.query)
+            if route is None:
+                raise ApiError(404, f"No route for {url.path}")
+            self._send_json(200, route(payload))
+        except ApiError as e:
+            error = {"error": str(e)}
+            if e.detail:
+                error["detail"] = e.detail
+            self._send_json(e.status, error)
+        except Exception as e:
+            self._send_json(500, {"error": f"Prediction failed: {e}"})
+
+    def do_GET(self):
+        self._dispatch({
+            "/health": lambda query: {"status": "ok"},
+            "/history": self.service.history,
+            "/alerts": self.service.alerts,
+            "/metrics": lambda query: self.service.metrics(),
+        }, read_body=False)
+
+    def do_POST(self):
+        self._dispatch({
+            "/predict": self.service.predict,
+            "/predict/batch": self.service.predict_batch,
+        }, read_body=True)
+
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=8502, max_concurrency=2, verbose=False):
+    service = ScoringService(max_concurrency=max_concurrency)
+    handler = type("Handler", (ScoringHandler,), {"service": service, "verbose": verbose})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Burnout scoring HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--max-concurrency", type=int, default=2,
+                        help="Inference worker threads")
+    parser.add_argument("--no-warmup", action="store_true", help="Load BERT on the first request")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.no_warmup:
+        from model import get_predictor
+        get_predictor()
+
+    server = make_server(args.host, args.port, args.max_concurrency, args.verbose)
+    print(f"✅ Scoring API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,28 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime
+from importlib.util import find_spec
 import os
 import sys
-import numpy as np
 from pathlib import Path
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent))
 
-# Try to import your modules, if not available create simple versions
-try:
-    from model import predict_burnout
+from utils import history_summary
+from memprofile import profiler
+
+# Heavy libraries are imported by the pages that use them, so the Home
+# Dashboard renders without paying for torch/transformers/matplotlib
+MODULES_LOADED = all(
+    find_spec(name) is not None
+    for name in ("numpy", "pandas", "matplotlib", "torch", "transformers")
+)
+
+if MODULES_LOADED:
     from utils import save_record, load_history
-    from analytics import burnout_trend_chart
-    MODULES_LOADED = True
-except ImportError:
-    MODULES_LOADED = False
+else:
     # Create simple fallback functions
-    def predict_burnout(text, screen, sleep):
+    def predict_burnout(text, screen, sleep, return_vector=False):
         """Fallback prediction function"""
         # Simple calculation based on inputs
         text_len = min(len(text) / 100, 1)
@@ -30,12 +33,16 @@ except ImportError:
         risk = min(max(risk, 0), 100)
         
         # Generate some sentiment value
+        import numpy as np
         sentiment = np.random.uniform(0.1, 0.9)
         
+        if return_vector:
+            return round(risk, 2), round(sentiment, 3), None
         return round(risk, 2), round(sentiment, 3)
     
-    def save_record(text, screen, sleep, score):
+    def save_record(text, screen, sleep, score, vector=None, user_id=None):
         """Fallback save function"""
+        import pandas as pd
         os.makedirs("data", exist_ok=True)
         
         record = {
@@ -55,10 +62,10 @@ except ImportError:
             df = pd.DataFrame([record])
         
         df.to_csv(file_path, index=False)
-        return True
     
     def load_history():
         """Fallback load function"""
+        import pandas as pd
         file_path = "data/history.csv"
         if os.path.exists(file_path):
             return pd.read_csv(file_path)
@@ -66,6 +73,7 @@ except ImportError:
     
     def burnout_trend_chart(df):
         """Fallback chart function"""
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots(figsize=(10, 4))
         
         if 'burnout_score' in df.columns:
@@ -88,6 +96,88 @@ except ImportError:
         
         return fig
 
+@st.cache_resource
+def get_vector_index():
+    """Shared nearest-neighbour index over saved check-in embeddings"""
+    from embeddings import VectorIndex
+    return VectorIndex()
+
+@st.cache_resource
+def get_cohort_percentiles():
+    """Survey score distributions per cohort, or None without the survey file"""
+    from cohorts import CohortPercentiles, SURVEY_PATH
+    if not os.path.exists(SURVEY_PATH):
+        return None
+    return CohortPercentiles.load()
+
+@st.cache_resource
+def get_survey_index():
+    """Bitmap index over the survey's categorical columns, or None without the survey"""
+    from bitmaps import SurveyIndex, SURVEY_PATH
+    if not os.path.exists(SURVEY_PATH):
+        return None
+    return SurveyIndex.load()
+
+@st.cache_resource
+def get_prediction_scheduler():
+    """One background inference worker shared by every session"""
+    from scheduler import InferenceScheduler, INTERACTIVE
+    return InferenceScheduler(workers=1, deadlines={INTERACTIVE: 60.0})
+
+def run_prediction(superseded, user_id, text, screen, sleep, index):
+    """Predict and save on the worker; skip saving if a newer job replaced this one"""
+    with profiler.track("prediction"):
+        score, sentiment, text_vector = predict_burnout(text, screen, sleep, return_vector=True)
+        if superseded.is_set():
+            return None
+        
+        # Rows saved before this check-in; the record itself is written in the background
+        rows_before = len(index.store) if index is not None else 0
+        save_record(text, screen, sleep, score, vector=text_vector, user_id=user_id)
+    return {
+        "score": score,
+        "sentiment": sentiment,
+        "text_vector": text_vector,
+        "rows_before": rows_before,
+    }
+
+def submit_prediction(text, screen, sleep):
+    """Queue a prediction for this session, superseding any unfinished one"""
+    import threading
+    import time
+    from scheduler import Busy
+    from utils import text_hash
+    
+    scheduler = get_prediction_scheduler()
+    key = (text_hash(text), screen, sleep)
+    previous = st.session_state.get("prediction_job")
+    if previous is not None and not previous["future"].done():
+        # Same inputs clicked again: keep waiting for the job already running
+        if previous["key"] == key:
+            return previous
+        # Queued jobs are dropped; a running one finishes but is neither saved nor shown
+        previous["superseded"].set()
+        scheduler.cancel(previous["future"])
+    
+    job = {"key": key, "inputs": (text, screen, sleep), "superseded": threading.Event(), "shown": False,
+           "submitted": time.time()}
+    index = get_vector_index() if MODULES_LOADED else None
+    try:
+        job["future"] = scheduler.submit(run_prediction, job["superseded"], st.session_state.user_id,
+                                         text, screen, sleep, index)
+    except Busy:
+        st.session_state.prediction_job = None
+        st.warning("⏳ The analyzer is busy right now. Please try again in a moment.")
+        return None
+    st.session_state.prediction_job = job
+    return job
+
+@st.cache_resource
+def get_factor_grid():
+    """Shared screen x sleep aggregation, updated as history grows"""
+    from analytics import FactorGrid
+    return FactorGrid()
+
 # Page configuration
 st.set_page_config(
     page_title="Burnout AI Detection System",
@@ -168,9 +258,10 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize session state
-if 'prediction_history' not in st.session_state:
-    st.session_state.prediction_history = []
+# Risk state follows the ?user= query parameter, so a reload keeps it; without
+# one, sessions share the local user that the existing history seeds
+from alerts import DEFAULT_USER
+st.session_state.user_id = st.query_params.get("user") or DEFAULT_USER
 
 # ---------- SIDEBAR ----------
 with st.sidebar:
@@ -183,7 +274,7 @@ with st.sidebar:
     st.markdown("---")
     page = st.radio(
         "📌 **Navigation Menu**",
-        ["🏠 Home Dashboard", "🔍 Burnout Prediction", "📊 Analytics & Trends", "📋 About"],
+        ["🏠 Home Dashboard", "🔍 Burnout Prediction", "📊 Analytics & Trends", "🧭 Survey Explorer", "📋 About"],
         key="nav"
     )
     
@@ -203,11 +294,11 @@ with st.sidebar:
     st.markdown("### 📊 Quick Stats")
     
     try:
-        history_df = load_history()
-        if history_df is not None and not history_df.empty:
-            avg_score = history_df['burnout_score'].mean()
+        # Streams the CSV without pandas so every page stays light
+        record_count, avg_score = history_summary()
+        if record_count:
             st.metric("Avg. Burnout Score", f"{avg_score:.1f}%")
-            st.metric("Total Records", len(history_df))
+            st.metric("Total Records", record_count)
         else:
             st.metric("Avg. Burnout Score", "0%")
             st.metric("Total Records", "0")
@@ -215,6 +306,7 @@ with st.sidebar:
         st.metric("Avg. Burnout Score", "0%")
         st.metric("Total Records", "0")
 
+
 # ---------- HOME DASHBOARD ----------
 if page == "🏠 Home Dashboard":
     col1, col2 = st.columns([3, 1])
@@ -317,6 +409,18 @@ if page == "🏠 Home Dashboard":
 
 # ---------- BURNOUT PREDICTION ----------
 elif page == "🔍 Burnout Prediction":
+    import pandas as pd
+    from session_history import PredictionRing
+    from utils import text_hash
+    from cohorts import COHORT_COLUMNS
+    import numpy as np
+    if MODULES_LOADED:
+        from model import predict_burnout, what_if_burnout, SCREEN_GRID, SLEEP_GRID
+    
+    # Initialize session state: bounded, array-backed prediction history
+    if 'prediction_history' not in st.session_state:
+        st.session_state.prediction_history = PredictionRing()
+    
     st.markdown("<div class='main-header'>🔍 Burnout Risk Assessment</div>", unsafe_allow_html=True)
     
     st.markdown("""
@@ -377,6 +481,22 @@ elif page == "🔍 Burnout Prediction":
             )
             st.metric("Level", f"{stress_level}/10")
         
+        # Optional cohort for the percentile comparison
+        cohort_choices = {}
+        cohorts = get_cohort_percentiles() if MODULES_LOADED else None
+        if cohorts is not None:
+            with st.expander("👥 **Compare With People Like You** (optional)", expanded=False):
+                cohort_cols = st.columns(len(COHORT_COLUMNS))
+                for cohort_col, column in zip(cohort_cols, COHORT_COLUMNS):
+                    with cohort_col:
+                        choice = st.selectbox(
+                            column,
+                            ["Any"] + cohorts.values(column),
+                            key=f"cohort_{column}"
+                        )
+                        if choice != "Any":
+                            cohort_choices[column] = choice
+        
         # Prediction button
         st.markdown("---")
         predict_button = st.button(
@@ -385,6 +505,13 @@ elif page == "🔍 Burnout Prediction":
             use_container_width=True,
             key="predict_button"
         )
+        what_if_button = st.button(
+            "🔮 **What-if: Explore Screen & Sleep**",
+            use_container_width=True,
+            disabled=not MODULES_LOADED,
+            help="See how your risk changes across all screen-time and sleep values",
+            key="what_if_button"
+        )
     
     with preview_col:
         st.markdown("### 📋 **Input Summary**")
@@ -433,199 +560,426 @@ elif page == "🔍 Burnout Prediction":
             - Any stressors
             """)
         else:
-            with st.spinner("🧠 **AI is analyzing your patterns...**"):
-                # Simulate processing time
-                import time
-                progress_bar = st.progress(0)
-                status_text = st.empty()
+            submit_prediction(text_input, screen_time, sleep_hours)
+    
+    # Poll the session's job: rerun until it is done, then show it once
+    prediction_job = st.session_state.get("prediction_job")
+    finished_job = None
+    if prediction_job is not None and not prediction_job["shown"]:
+        if prediction_job["future"].done():
+            prediction_job["shown"] = True
+            finished_job = prediction_job
+        else:
+            # Poll in a fragment so the page stays responsive; a full rerun shows the result
+            @st.fragment(run_every=0.5)
+            def prediction_pending():
+                if prediction_job["future"].done():
+                    st.rerun()
+                st.info("🧠 **AI is analyzing your patterns...** Results will appear here; clicking again with new input replaces this analysis.")
+            
+            prediction_pending()
+    
+    if finished_job is not None:
+        job_text, job_screen, job_sleep = finished_job["inputs"]
+        try:
+            result = finished_job["future"].result()
+            score, sentiment, text_vector = result["score"], result["sentiment"], result["text_vector"]
+            rows_before = result["rows_before"]
+            
+            # Read-only: the writer applies the risk update along with the history row
+            raised_alerts = []
+            if MODULES_LOADED:
+                from alerts import get_detector
+                risk_status = get_detector().status(st.session_state.user_id)
+                if risk_status is not None:
+                    raised_alerts = [alert for alert in risk_status["alerts"]
+                                     if alert["time"] >= finished_job["submitted"]]
+            
+            # Display results
+            st.markdown("---")
+            st.markdown("## 📊 **Analysis Results**")
+            
+            for alert in raised_alerts:
+                title = "Sustained High Risk" if alert["kind"] == "sustained" else "Sudden Spike"
+                st.warning(f"🚨 **{title}:** {alert['message']}")
+            
+            # Risk level display
+            if score >= 70:
+                st.markdown(f"""
+                <div class='risk-high'>
+                    <div style='display: flex; align-items: center; gap: 10px;'>
+                        <span style='font-size: 2rem;'>🔥</span>
+                        <h3 style='margin: 0;'>HIGH BURNOUT RISK: {score}%</h3>
+                    </div>
+                    <p style='margin-top: 10px;'><strong>Immediate attention recommended.</strong> Consider taking a break and consulting a mental health professional.</p>
+                </div>
+                """, unsafe_allow_html=True)
                 
-                for i in range(100):
-                    progress_bar.progress(i + 1)
-                    status_text.text(f"Analyzing... {i+1}%")
-                    time.sleep(0.02)
+            elif score >= 40:
+                st.markdown(f"""
+                <div class='risk-medium'>
+                    <div style='display: flex; align-items: center; gap: 10px;'>
+                        <span style='font-size: 2rem;'>⚠️</span>
+                        <h3 style='margin: 0;'>MODERATE RISK: {score}%</h3>
+                    </div>
+                    <p style='margin-top: 10px;'><strong>Early warning signs detected.</strong> Proactive measures advised to prevent escalation.</p>
+                </div>
+                """, unsafe_allow_html=True)
                 
-                status_text.text("Analysis complete!")
-                time.sleep(0.5)
-                progress_bar.empty()
-                status_text.empty()
+            else:
+                st.markdown(f"""
+                <div class='risk-low'>
+                    <div style='display: flex; align-items: center; gap: 10px;'>
+                        <span style='font-size: 2rem;'>✅</span>
+                        <h3 style='margin: 0;'>LOW RISK: {score}%</h3>
+                    </div>
+                    <p style='margin-top: 10px;'><strong>Good mental wellness maintained.</strong> Continue your healthy habits and regular check-ins.</p>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            # Detailed insights
+            st.markdown("---")
+            st.markdown("### 🧠 **Detailed Analysis**")
+            
+            insight_col1, insight_col2, insight_col3 = st.columns(3)
+            
+            with insight_col1:
+                sentiment_label = "High" if sentiment > 0.7 else "Moderate" if sentiment > 0.4 else "Low"
+                sentiment_color = "#EF4444" if sentiment > 0.7 else "#F59E0B" if sentiment > 0.4 else "#10B981"
+                st.metric(
+                    "Emotional Intensity", 
+                    f"{sentiment:.3f}",
+                    sentiment_label,
+                    delta_color="normal"
+                )
+            
+            with insight_col2:
+                screen_impact = min(job_screen / 12, 1) * 100
+                screen_label = "High" if screen_impact > 60 else "Moderate" if screen_impact > 30 else "Low"
+                st.metric(
+                    "Screen Time Impact", 
+                    f"{screen_impact:.1f}%",
+                    screen_label
+                )
+            
+            with insight_col3:
+                sleep_impact = (1 - min(job_sleep / 8, 1)) * 100
+                sleep_label = "High" if sleep_impact > 50 else "Moderate" if sleep_impact > 25 else "Low"
+                st.metric(
+                    "Sleep Deficit", 
+                    f"{sleep_impact:.1f}%",
+                    sleep_label
+                )
+            
+            # Population percentile against the survey cohorts
+            if cohorts is not None:
+                st.markdown("---")
+                st.markdown("### 👥 **How You Compare**")
                 
-                try:
-                    # Get prediction
-                    score, sentiment = predict_burnout(text_input, screen_time, sleep_hours)
-                    
-                    # Save record
-                    save_record(text_input, screen_time, sleep_hours, score)
-                    
-                    # Display results
-                    st.markdown("---")
-                    st.markdown("## 📊 **Analysis Results**")
+                comparisons = [("All respondents", None, None)] + [
+                    (f"{value} ({column})", column, value)
+                    for column, value in cohort_choices.items()
+                ]
+                compare_cols = st.columns(len(comparisons))
+                for compare_col, (label, column, value) in zip(compare_cols, comparisons):
+                    with compare_col:
+                        percentile = cohorts.percentile(score, column, value)
+                        if percentile is not None:
+                            st.metric(
+                                label,
+                                f"{percentile:.0f}th percentile",
+                                f"{cohorts.size(column, value)} people",
+                                delta_color="off"
+                            )
+                st.caption("Share of survey respondents whose burnout level is at or below your score.")
+            
+            # Recommendations
+            st.markdown("---")
+            st.markdown("### 💡 **Personalized Recommendations**")
+            
+            if score >= 70:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.error("""
+                    **🚨 Immediate Actions:**
+                    1. Take at least 2-3 days off work
+                    2. Schedule appointment with mental health professional
+                    3. Digital detox: Reduce screen time by 50%
+                    4. Prioritize 8+ hours of sleep
+                    5. Practice daily mindfulness (20 mins)
+                    """)
+                with col2:
+                    st.error("""
+                    **📋 This Week:**
+                    - Talk to HR about workload
+                    - Establish work boundaries
+                    - Start exercise routine (30 mins/day)
+                    - Connect with support network
+                    - Monitor symptoms daily
+                    """)
                     
-                    # Risk level display
-                    if score >= 70:
-                        st.markdown(f"""
-                        <div class='risk-high'>
-                            <div style='display: flex; align-items: center; gap: 10px;'>
-                                <span style='font-size: 2rem;'>🔥</span>
-                                <h3 style='margin: 0;'>HIGH BURNOUT RISK: {score}%</h3>
-                            </div>
-                            <p style='margin-top: 10px;'><strong>Immediate attention recommended.</strong> Consider taking a break and consulting a mental health professional.</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                    elif score >= 40:
-                        st.markdown(f"""
-                        <div class='risk-medium'>
-                            <div style='display: flex; align-items: center; gap: 10px;'>
-                                <span style='font-size: 2rem;'>⚠️</span>
-                                <h3 style='margin: 0;'>MODERATE RISK: {score}%</h3>
-                            </div>
-                            <p style='margin-top: 10px;'><strong>Early warning signs detected.</strong> Proactive measures advised to prevent escalation.</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                    else:
-                        st.markdown(f"""
-                        <div class='risk-low'>
-                            <div style='display: flex; align-items: center; gap: 10px;'>
-                                <span style='font-size: 2rem;'>✅</span>
-                                <h3 style='margin: 0;'>LOW RISK: {score}%</h3>
-                            </div>
-                            <p style='margin-top: 10px;'><strong>Good mental wellness maintained.</strong> Continue your healthy habits and regular check-ins.</p>
-                        </div>
-                        """, unsafe_allow_html=True)
+            elif score >= 40:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.warning("""
+                    **🛡️ Preventive Measures:**
+                    1. Schedule lighter workload next week
+                    2. Practice 10-min meditation daily
+                    3. Maintain consistent sleep schedule
+                    4. Take regular breaks during work
+                    5. Plan social activities
+                    """)
+                with col2:
+                    st.warning("""
+                    **📊 Monitoring:**
+                    - Weekly self-check-ins
+                    - Track sleep patterns
+                    - Monitor screen time
+                    - Journal emotions daily
+                    - Set work-life boundaries
+                    """)
                     
-                    # Detailed insights
+            else:
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.success("""
+                    **✅ Maintenance:**
+                    1. Continue current wellness practices
+                    2. Regular breaks during work
+                    3. Maintain social connections
+                    4. Keep work-life balance
+                    5. Weekly reflection time
+                    """)
+                with col2:
+                    st.success("""
+                    **🌟 Enhancement:**
+                    - Try new stress-relief activities
+                    - Learn mindfulness techniques
+                    - Optimize sleep environment
+                    - Build resilience skills
+                    - Regular exercise routine
+                    """)
+            
+            # Similar past check-ins
+            if text_vector is not None and MODULES_LOADED:
+                index = get_vector_index()
+                matches = [
+                    (row, similarity) for row, similarity in index.search(text_vector, k=4)
+                    if row < rows_before
+                ][:3]
+                past_df = load_history() if matches else None
+                
+                if past_df is not None and not past_df.empty:
                     st.markdown("---")
-                    st.markdown("### 🧠 **Detailed Analysis**")
-                    
-                    insight_col1, insight_col2, insight_col3 = st.columns(3)
-                    
-                    with insight_col1:
-                        sentiment_label = "High" if sentiment > 0.7 else "Moderate" if sentiment > 0.4 else "Low"
-                        sentiment_color = "#EF4444" if sentiment > 0.7 else "#F59E0B" if sentiment > 0.4 else "#10B981"
-                        st.metric(
-                            "Emotional Intensity", 
-                            f"{sentiment:.3f}",
-                            sentiment_label,
-                            delta_color="normal"
-                        )
+                    st.markdown("### 🕰️ **You Felt Like This Before**")
                     
-                    with insight_col2:
-                        screen_impact = min(screen_time / 12, 1) * 100
-                        screen_label = "High" if screen_impact > 60 else "Moderate" if screen_impact > 30 else "Low"
-                        st.metric(
-                            "Screen Time Impact", 
-                            f"{screen_impact:.1f}%",
-                            screen_label
+                    for row, similarity in matches:
+                        if row >= len(past_df):
+                            continue
+                        past = past_df.iloc[row]
+                        st.info(
+                            f"**{past['date']}** · Risk {past['burnout_score']:.1f}% · "
+                            f"{similarity * 100:.0f}% similar\n\n_{past['text_preview']}_"
                         )
-                    
-                    with insight_col3:
-                        sleep_impact = (1 - min(sleep_hours / 8, 1)) * 100
-                        sleep_label = "High" if sleep_impact > 50 else "Moderate" if sleep_impact > 25 else "Low"
-                        st.metric(
-                            "Sleep Deficit", 
-                            f"{sleep_impact:.1f}%",
-                            sleep_label
-                        )
-                    
-                    # Recommendations
-                    st.markdown("---")
-                    st.markdown("### 💡 **Personalized Recommendations**")
-                    
-                    if score >= 70:
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.error("""
-                            **🚨 Immediate Actions:**
-                            1. Take at least 2-3 days off work
-                            2. Schedule appointment with mental health professional
-                            3. Digital detox: Reduce screen time by 50%
-                            4. Prioritize 8+ hours of sleep
-                            5. Practice daily mindfulness (20 mins)
-                            """)
-                        with col2:
-                            st.error("""
-                            **📋 This Week:**
-                            - Talk to HR about workload
-                            - Establish work boundaries
-                            - Start exercise routine (30 mins/day)
-                            - Connect with support network
-                            - Monitor symptoms daily
-                            """)
-                            
-                    elif score >= 40:
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.warning("""
-                            **🛡️ Preventive Measures:**
-                            1. Schedule lighter workload next week
-                            2. Practice 10-min meditation daily
-                            3. Maintain consistent sleep schedule
-                            4. Take regular breaks during work
-                            5. Plan social activities
-                            """)
-                        with col2:
-                            st.warning("""
-                            **📊 Monitoring:**
-                            - Weekly self-check-ins
-                            - Track sleep patterns
-                            - Monitor screen time
-                            - Journal emotions daily
-                            - Set work-life boundaries
-                            """)
-                            
-                    else:
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            st.success("""
-                            **✅ Maintenance:**
-                            1. Continue current wellness practices
-                            2. Regular breaks during work
-                            3. Maintain social connections
-                            4. Keep work-life balance
-                            5. Weekly reflection time
-                            """)
-                        with col2:
-                            st.success("""
-                            **🌟 Enhancement:**
-                            - Try new stress-relief activities
-                            - Learn mindfulness techniques
-                            - Optimize sleep environment
-                            - Build resilience skills
-                            - Regular exercise routine
-                            """)
-                    
-                    # Store in session
-                    st.session_state.prediction_history.append({
-                        'score': score,
-                        'time': datetime.now().strftime("%H:%M"),
-                        'sentiment': sentiment,
-                        'screen': screen_time,
-                        'sleep': sleep_hours
-                    })
-                    
-                    # Success message
-                    st.balloons()
-                    st.success("✅ Analysis saved to your history!")
-                    
-                except Exception as e:
-                    st.error(f"❌ **Prediction Error:** {str(e)}")
-                    st.info("""
-                    **Troubleshooting:**
-                    1. Make sure all dependencies are installed
-                    2. Check your internet connection
-                    3. Try refreshing the page
-                    4. Contact support if issue persists
-                    """)
+            
+            # Store in session
+            session_history = st.session_state.prediction_history
+            session_history.append(
+                score, sentiment, job_screen, job_sleep, text_hash(job_text)
+            )
+            
+            if len(session_history) > 1:
+                st.markdown("#### 📈 This Session")
+                st.line_chart(
+                    pd.DataFrame({"Burnout Score": session_history.column("score")}),
+                    height=200
+                )
+            
+            # Success message
+            st.balloons()
+            st.success("✅ Analysis saved to your history!")
+            
+        except Exception as e:
+            st.error(f"❌ **Prediction Error:** {str(e)}")
+            st.info("""
+            **Troubleshooting:**
+            1. Make sure all dependencies are installed
+            2. Check your internet connection
+            3. Try refreshing the page
+            4. Contact support if issue persists
+            """)
+    
+    # What-if sweep: the text is encoded once for the whole screen x sleep grid
+    if what_if_button:
+        if not text_input.strip():
+            st.error("## ❌ Please describe your feelings first")
+        else:
+            # Same single worker as predictions, so the two never run the model at once
+            from scheduler import Busy
+            scheduler = get_prediction_scheduler()
+            previous = st.session_state.get("what_if_job")
+            if previous is not None:
+                scheduler.cancel(previous["future"])
+            try:
+                st.session_state.what_if_job = {
+                    "text_hash": text_hash(text_input),
+                    "future": scheduler.submit(what_if_burnout, text_input),
+                }
+            except Busy:
+                st.session_state.what_if_job = None
+                st.warning("⏳ The analyzer is busy right now. Please try again in a moment.")
+    
+    what_if_job = st.session_state.get("what_if_job")
+    if what_if_job is not None:
+        if not what_if_job["future"].done():
+            @st.fragment(run_every=0.5)
+            def what_if_pending():
+                if what_if_job["future"].done():
+                    st.rerun()
+                st.info("🧠 **Sweeping screen time and sleep...**")
+            
+            what_if_pending()
+        else:
+            st.session_state.what_if_job = None
+            try:
+                what_if_risk, what_if_sentiment = what_if_job["future"].result()
+                st.session_state.what_if = {
+                    "text_hash": what_if_job["text_hash"],
+                    "risk": what_if_risk,
+                    "sentiment": what_if_sentiment
+                }
+            except Exception as e:
+                st.error(f"❌ **What-if Error:** {str(e)}")
+    
+    # The surface does not depend on the sliders, so reuse it while the text is unchanged
+    what_if = st.session_state.get("what_if")
+    if what_if is not None and text_input.strip() and what_if["text_hash"] == text_hash(text_input):
+        import matplotlib.pyplot as plt
+        from analytics import what_if_chart
+        
+        risk_surface = what_if["risk"]
+        screen_idx = int(np.abs(SCREEN_GRID - screen_time).argmin())
+        sleep_idx = int(np.abs(SLEEP_GRID - sleep_hours).argmin())
+        best_screen_idx, best_sleep_idx = np.unravel_index(risk_surface.argmin(), risk_surface.shape)
+        
+        st.markdown("---")
+        st.markdown("## 🔮 **What-if Analysis**")
+        
+        what_if_col1, what_if_col2, what_if_col3 = st.columns(3)
+        with what_if_col1:
+            st.metric("Risk at Current Sliders", f"{risk_surface[screen_idx, sleep_idx]:.1f}%")
+        with what_if_col2:
+            st.metric(
+                "Lowest Reachable Risk",
+                f"{risk_surface[best_screen_idx, best_sleep_idx]:.1f}%",
+                f"{SCREEN_GRID[best_screen_idx]:.1f}h screen, {SLEEP_GRID[best_sleep_idx]:.1f}h sleep",
+                delta_color="off"
+            )
+        with what_if_col3:
+            st.metric("Emotional Intensity", f"{what_if['sentiment']:.3f}")
+        
+        what_if_fig = what_if_chart(SCREEN_GRID, SLEEP_GRID, risk_surface, screen_time, sleep_hours)
+        st.pyplot(what_if_fig)
+        plt.close(what_if_fig)
+        st.caption("Move the sliders to see your position on the surface; the text is not re-analyzed.")
 
 # ---------- ANALYTICS & TRENDS ----------
 elif page == "📊 Analytics & Trends":
+    import pandas as pd
+    import matplotlib.pyplot as plt
+    if MODULES_LOADED:
+        from analytics import burnout_trend_chart, factor_heatmap_chart, HistoryStats
+        from utils import HistoryTail
+    
     st.markdown("<div class='main-header'>📊 Analytics Dashboard</div>", unsafe_allow_html=True)
     
+    live_col1, live_col2 = st.columns([3, 1])
+    with live_col1:
+        live_mode = st.toggle(
+            "🔴 Live mode",
+            value=False,
+            disabled=not MODULES_LOADED,
+            help="Follow the history file and update with new records only"
+        )
+    with live_col2:
+        refresh_seconds = st.selectbox(
+            "Refresh every (s)",
+            [2, 5, 10, 30, 60],
+            index=1,
+            disabled=not live_mode
+        )
+    
     # Load history
-    history_df = load_history()
+    history_df = None
+    if not live_mode:
+        with profiler.track("analytics_load"):
+            history_df = load_history()
+    
+    if live_mode:
+        # Only this fragment reruns on the timer; widgets stay responsive in between
+        @st.fragment(run_every=refresh_seconds)
+        def live_view():
+            # Tail state lives in the session so each refresh reads only new bytes
+            if "history_tail" not in st.session_state:
+                st.session_state.history_tail = HistoryTail()
+                st.session_state.history_stats = HistoryStats()
+            tail = st.session_state.history_tail
+            stats = st.session_state.history_stats
+            
+            with profiler.track("analytics_tail"):
+                new_rows, restarted = tail.poll()
+                if restarted:
+                    stats.reset()
+                stats.update(new_rows)
+            
+            if stats.count == 0:
+                st.info("Waiting for the first record... this view updates automatically.")
+            else:
+                new_count = 0 if new_rows is None else len(new_rows)
+                st.markdown(f"### 📋 **Live Summary** ({stats.count} records, +{new_count} new)")
+                
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Average Risk", f"{stats.mean:.1f}%")
+                with col2:
+                    st.metric("Peak Risk", f"{stats.peak:.1f}%")
+                with col3:
+                    st.metric("Lowest Risk", f"{stats.lowest:.1f}%")
+                with col4:
+                    st.metric("Latest Score", f"{stats.latest:.1f}%")
+                
+                st.markdown("---")
+                st.markdown("### 📄 **Latest Records**")
+                latest_df = pd.DataFrame(list(stats.latest_rows)).iloc[::-1]
+                st.dataframe(latest_df, use_container_width=True, height=350)
+                
+                st.markdown("---")
+                chart_col1, chart_col2 = st.columns(2)
+                
+                with chart_col1:
+                    st.markdown(f"#### Risk Score Trend (last {len(stats.recent_scores)})")
+                    with profiler.track("analytics_charts"):
+                        fig1 = burnout_trend_chart(pd.DataFrame({'burnout_score': list(stats.recent_scores)}))
+                    st.pyplot(fig1)
+                    plt.close(fig1)
+                
+                with chart_col2:
+                    st.markdown("#### Factor Correlation")
+                    with profiler.track("analytics_charts"):
+                        fig2 = factor_heatmap_chart(stats.grid)
+                    st.pyplot(fig2)
+                    plt.close(fig2)
+                
+                if stats.count >= 3:
+                    trend = sum(list(stats.recent_scores)[-3:]) / 3 - sum(stats.first_scores) / 3
+                    st.caption(f"Trend since the first records: {trend:+.1f}% · "
+                               f"{stats.high_risk} high-risk records")
+            
+            st.caption(f"Last checked {datetime.now().strftime('%H:%M:%S')} · next refresh in {refresh_seconds}s")
+        
+        live_view()
     
-    if history_df is None or history_df.empty:
+    elif history_df is None or history_df.empty:
         st.info("""
         ## 📈 No Data Available Yet
         
@@ -679,6 +1033,7 @@ elif page == "📊 Analytics & Trends":
         
         plt.tight_layout()
         st.pyplot(fig)
+        plt.close(fig)
         
         st.caption("*This is sample data. Your actual data will appear after predictions.*")
         
@@ -749,57 +1104,54 @@ elif page == "📊 Analytics & Trends":
         
         with chart_col1:
             st.markdown("#### Risk Score Trend")
-            fig1 = burnout_trend_chart(history_df)
+            with profiler.track("analytics_charts"):
+                fig1 = burnout_trend_chart(history_df)
             st.pyplot(fig1)
+            plt.close(fig1)
         
         with chart_col2:
             st.markdown("#### Factor Correlation")
-            fig2, ax2 = plt.subplots(figsize=(8, 4))
             
-            if all(col in history_df.columns for col in ['screen_hours', 'sleep_hours', 'burnout_score']):
-                # Scatter plot with size based on score
-                scatter = ax2.scatter(
-                    history_df['screen_hours'],
-                    history_df['sleep_hours'],
-                    c=history_df['burnout_score'],
-                    cmap='RdYlGn_r',
-                    s=history_df['burnout_score'] * 2,
-                    alpha=0.7,
-                    edgecolors='black',
-                    linewidth=0.5
-                )
-                ax2.set_xlabel('Screen Time (hours)', fontsize=11)
-                ax2.set_ylabel('Sleep Duration (hours)', fontsize=11)
-                ax2.set_title('Screen Time vs Sleep Duration Impact', fontsize=12, pad=10)
-                ax2.grid(True, alpha=0.3)
-                
-                # Add colorbar
-                cbar = plt.colorbar(scatter, ax=ax2)
-                cbar.set_label('Burnout Score %', fontsize=10)
-                
-                # Optimal zone
-                ax2.axvline(x=6, color='green', linestyle=':', alpha=0.5)
-                ax2.axhline(y=7, color='green', linestyle=':', alpha=0.5)
-                ax2.text(6.1, 7.1, 'Optimal Zone', fontsize=9, color='green')
-                
+            if MODULES_LOADED and all(col in history_df.columns for col in ['screen_hours', 'sleep_hours', 'burnout_score']):
+                # Binned heatmap: cost depends on grid size, not row count
+                with profiler.track("analytics_charts"):
+                    fig2 = factor_heatmap_chart(get_factor_grid().sync(history_df))
             else:
+                fig2, ax2 = plt.subplots(figsize=(8, 4))
                 ax2.text(0.5, 0.5, 'Insufficient data for correlation', 
                         ha='center', va='center', transform=ax2.transAxes,
                         fontsize=11)
+                plt.tight_layout()
             
-            plt.tight_layout()
             st.pyplot(fig2)
+            plt.close(fig2)
         
         # Insights
         st.markdown("---")
         st.markdown("### 🔍 **Key Insights**")
         
+        # Streaming risk state, kept current by every save
+        risk_status = None
+        if MODULES_LOADED:
+            from alerts import get_detector
+            risk_status = get_detector().status(st.session_state.user_id)
+        
+        if risk_status is not None and risk_status["sustained"]:
+            st.error(f"🚨 **Sustained High Risk:** {risk_status['high_risk_run']} check-ins in a row at or above 70%")
+        latest_alert = risk_status["alerts"][-1] if risk_status is not None and risk_status["alerts"] else None
+        if latest_alert and latest_alert["kind"] == "spike" and datetime.now().timestamp() - latest_alert["time"] < 86400:
+            spike = latest_alert
+            st.warning(f"⚡ **Recent Spike** ({datetime.fromtimestamp(spike['time']).strftime('%Y-%m-%d %H:%M')}): "
+                       f"{spike['message']}")
+        
         if len(history_df) >= 3:
-            # Calculate trend
-            recent_scores = history_df['burnout_score'].tail(3).values
-            older_scores = history_df['burnout_score'].head(3).values
-            
-            trend = recent_scores.mean() - older_scores.mean()
+            if risk_status is not None and risk_status["count"] >= 3:
+                # Recent weighted average against the all-time average
+                trend = risk_status["ewma"] - risk_status["mean"]
+            else:
+                recent_scores = history_df['burnout_score'].tail(3).values
+                older_scores = history_df['burnout_score'].head(3).values
+                trend = recent_scores.mean() - older_scores.mean()
             
             insight_col1, insight_col2 = st.columns(2)
             
@@ -849,6 +1201,11 @@ elif page == "📊 Analytics & Trends":
                 # Additional statistics
                 st.metric("Current Streak", f"{len(history_df)} days")
                 
+                if risk_status is not None:
+                    st.metric("Recent Average (EWMA)", f"{risk_status['ewma']:.1f}%",
+                              f"{risk_status['ewma'] - risk_status['mean']:+.1f}% vs overall",
+                              delta_color="inverse")
+                
                 high_risk_days = len(history_df[history_df['burnout_score'] >= 70])
                 if high_risk_days > 0:
                     st.metric("High Risk Days", f"{high_risk_days}", 
@@ -862,6 +1219,69 @@ elif page == "📊 Analytics & Trends":
         else:
             st.info("More data needed for detailed insights. Make more predictions to see trends.")
 
+# ---------- SURVEY EXPLORER ----------
+elif page == "🧭 Survey Explorer":
+    import time
+    import pandas as pd
+    
+    st.markdown("<div class='main-header'>🧭 Survey Explorer</div>", unsafe_allow_html=True)
+    
+    survey_index = get_survey_index() if MODULES_LOADED else None
+    if survey_index is None:
+        st.info("The workplace survey file is not available, so there is nothing to explore yet.")
+    else:
+        from bitmaps import FILTER_COLUMNS
+        
+        st.markdown(f"### 🔎 **Filter {survey_index.rows:,} Survey Responses**")
+        st.caption("Pick values to narrow the cohort; an empty filter means any value.")
+        
+        filters = {}
+        filter_cols = st.columns(4)
+        for i, column in enumerate(FILTER_COLUMNS):
+            if column not in survey_index.bitmaps:
+                continue
+            with filter_cols[i % 4]:
+                filters[column] = st.multiselect(column, survey_index.values(column), key=f"explore_{column}")
+        
+        group_by = st.selectbox(
+            "Break down by",
+            [column for column in FILTER_COLUMNS if column in survey_index.bitmaps],
+            key="explore_group_by"
+        )
+        
+        # Filters combine with bitwise ops on the bitmaps, no row scan
+        started = time.perf_counter()
+        selected = survey_index.select(filters)
+        summary = survey_index.aggregate(selected)
+        breakdown = survey_index.breakdown(group_by, selected)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        st.markdown("---")
+        if summary["count"] == 0:
+            st.warning("No responses match this combination of filters.")
+        else:
+            col1, col2, col3, col4, col5 = st.columns(5)
+            with col1:
+                st.metric("Responses", f"{summary['count']:,}")
+            with col2:
+                st.metric("Avg. Burnout", f"{summary['BurnoutLevel'] * 10:.1f}%")
+            with col3:
+                st.metric("High Risk", f"{summary['BurnoutRisk'] * 100:.1f}%")
+            with col4:
+                st.metric("Avg. Stress", f"{summary['StressLevel']:.1f}/10")
+            with col5:
+                st.metric("Avg. Sleep", f"{summary['SleepHours']:.1f}h")
+            
+            st.markdown(f"#### Average Burnout by {group_by}")
+            breakdown_df = pd.DataFrame(
+                [(value, count, mean * 10) for value, (count, mean) in breakdown.items()],
+                columns=[group_by, "Responses", "Avg. Burnout %"]
+            ).set_index(group_by)
+            st.bar_chart(breakdown_df["Avg. Burnout %"])
+            st.dataframe(breakdown_df, use_container_width=True)
+        
+        st.caption(f"Resolved in {elapsed_ms:.1f} ms · bitmap index {survey_index.nbytes / 1024 / 1024:.1f} MB")
+
 # ---------- ABOUT & DOCUMENTATION ----------
 else:
     st.markdown("<div class='main-header'>📋 About This Project</div>", unsafe_allow_html=True)
@@ -1021,6 +1441,31 @@ else:
                 else:
                     st.warning("Please fill all fields.")
 
+# Memory debug view (opt-in with BURNOUT_MEMPROFILE=1)
+if profiler.enabled:
+    with st.sidebar:
+        st.markdown("---")
+        with st.expander("🧪 **Memory Profile**", expanded=False):
+            page_history = history_df if page == "📊 Analytics & Trends" else None
+            report = profiler.report(history_df=page_history, session_state=st.session_state)
+            
+            for name, value in report["components"].items():
+                st.text(f"{name}: {value / 1024 / 1024:.1f} MB")
+            for name, value in report["counts"].items():
+                st.text(f"{name}: {value}")
+            
+            for name, section in report["sections"].items():
+                last = section["last"]
+                st.text(
+                    f"{name} x{section['calls']}: RSS {last['rss_delta'] / 1024:+.0f} KB, "
+                    f"alloc {last['alloc_delta'] / 1024:+.0f} KB"
+                    + (" (overlapped)" if last["overlapped"] else "")
+                )
+            
+            if st.button("💾 Dump Memory Report", key="memprofile_dump"):
+                path = profiler.dump(history_df=page_history, session_state=st.session_state)
+                st.success(f"Saved to {path}")
+
 # Footer
 st.markdown("---")
 footer_col1, footer_col2, footer_col3 = st.columns(3)
@@ -1032,4 +1477,4 @@ with footer_col2:
     st.caption("Made with ❤️ for mental health awareness")
 
 with footer_col3:
-    st.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
\ No newline at end of file
+    st.caption(f"Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
@@ -0,0 +1,92 @@
+"""Cascade vs full-model report: escalation rate, latency savings, agreement
+
+Texts come from the saved history (data/history.csv, else history.csv),
+read in full from the text store, plus the early-exit sample texts, each
+crossed with a spread of screen/sleep values. Half the texts calibrate the
+cheap tier, the other half are scored.
+The fit is saved to data/cascade.json, which the API's cascade tier loads,
+so the numbers reported here describe the cascade that is served.
+
+Usage: python benchmarks/cascade_report.py [--band 5] [--samples 200]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SCREEN_VALUES = (2, 5, 7, 9, 12)
+SLEEP_VALUES = (4, 5.5, 6.5, 7.5, 9)
+
+
+def category(score):
+    return "high" if score >= 70 else "moderate" if score >= 40 else "low"
+
+
+def load_texts():
+    from early_exit import SAMPLE_TEXTS, calibration_texts
+    from textstore import TextStore
+
+    # Full texts by text_hash, the same set early-exit calibration uses
+    for path in (ROOT / "data" / "history.csv", ROOT / "history.csv"):
+        if os.path.exists(path):
+            texts = calibration_texts(str(path), store=TextStore(str(ROOT / "data" / "texts")))
+            break
+    else:
+        texts = list(SAMPLE_TEXTS)
+    return list(dict.fromkeys(text for text in texts if text))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--band", type=float, default=5.0, help="Escalation band around 40%%/70%%")
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    from model import BurnoutPredictor
+    from cascade import CALIBRATION_PATH, CascadePredictor
+
+    predictor = BurnoutPredictor()
+    texts = load_texts()
+    calibration, evaluation = texts[::2], texts[1::2]
+    cascade = CascadePredictor(predictor, band=args.band).calibrate(
+        calibration, path=str(ROOT / CALIBRATION_PATH))
+
+    cases = [
+        (text, screen, sleep)
+        for text in evaluation for screen in SCREEN_VALUES for sleep in SLEEP_VALUES
+    ][:args.samples]
+
+    full_seconds = 0.0
+    agree = 0
+    abs_errors = []
+    for text, screen, sleep in cases:
+        start = time.perf_counter()
+        full_score, _ = predictor.predict(text, screen, sleep)
+        full_seconds += time.perf_counter() - start
+
+        cascade_score, _ = cascade.predict(text, screen, sleep)
+        agree += category(cascade_score) == category(full_score)
+        abs_errors.append(abs(cascade_score - full_score))
+
+    stats = cascade.stats()
+    full_ms = 1000 * full_seconds / len(cases)
+    print(f"{len(cases)} requests, band ±{args.band:g} points, "
+          f"calibrated on {len(calibration)} texts "
+          f"(prior {cascade.emotional_prior:.4f}, per hit {cascade.emotional_per_hit:.4f})")
+    print(f"  escalation rate      {stats['escalation_rate'] * 100:6.1f}%")
+    print(f"  full model latency   {full_ms:8.2f} ms/request")
+    print(f"  cascade latency      {stats['cascade_ms_avg']:8.2f} ms/request "
+          f"(cheap tier {stats['cheap_ms_avg']:.3f} ms)")
+    print(f"  latency saved        {100 * (1 - stats['cascade_ms_avg'] / full_ms):6.1f}%")
+    print(f"  category agreement   {100 * agree / len(cases):6.1f}%")
+    print(f"  mean |score diff|    {sum(abs_errors) / len(abs_errors):8.2f} points "
+          f"(max {max(abs_errors):.2f})")
+    print(f"✅ Calibration saved to {CALIBRATION_PATH}")
+
+
+if __name__ == "__main__":
+    main()
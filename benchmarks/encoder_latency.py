@@ -0,0 +1,53 @@
+"""Eager vs TorchScript-bucketed encoder latency for single texts
+
+Usage: python benchmarks/encoder_latency.py [--repeats 30]
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SAMPLE_WORDS = (
+    "I have been working long hours and feel exhausted most days, "
+    "struggling to focus and sleeping badly before every deadline "
+).split()
+
+
+def sample_text(words):
+    return " ".join(SAMPLE_WORDS[i % len(SAMPLE_WORDS)] for i in range(words))
+
+
+def time_calls(fn, text, repeats):
+    fn(text)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(0.95 * (len(timings) - 1))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    from model import BurnoutPredictor
+
+    eager = BurnoutPredictor()
+    compiled = BurnoutPredictor(compiled=True)
+
+    print(f"{'words':>6} {'eager p50':>10} {'eager p95':>10} {'jit p50':>10} {'jit p95':>10}  (ms)")
+    for words in (5, 12, 25, 50, 90):
+        text = sample_text(words)
+        eager_p50, eager_p95 = time_calls(eager.analyze_sentiment, text, args.repeats)
+        jit_p50, jit_p95 = time_calls(compiled.analyze_sentiment, text, args.repeats)
+        print(f"{words:>6} {eager_p50:>10.1f} {eager_p95:>10.1f} {jit_p50:>10.1f} {jit_p95:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
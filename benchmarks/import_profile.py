@@ -0,0 +1,76 @@
+"""Import-time profile of the modules behind app.py
+
+Each module is imported in a fresh interpreter with `-X importtime`, so the
+numbers are cold-start costs including everything the module pulls in.
+
+Usage: python benchmarks/import_profile.py [--top 10] [module ...]
+"""
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "streamlit",
+    "utils",
+    "numpy",
+    "pandas",
+    "matplotlib.pyplot",
+    "analytics",
+    "embeddings",
+    "torch",
+    "transformers",
+    "model",
+]
+
+
+def profile_import(module):
+    """Return (total_ms, [(self_ms, cumulative_ms, name), ...]) for one import"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None, []
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        entries.append((int(self_us) / 1000, int(cumulative_us) / 1000, name.rstrip()))
+
+    # Top-level imports are the unindented names; together they are the total
+    total = sum(cumulative for _, cumulative, name in entries if not name.startswith("  "))
+    return total, entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--top", type=int, default=10, help="Heaviest sub-imports to list per module")
+    args = parser.parse_args(argv)
+
+    print(f"{'module':<20} {'import ms':>10}")
+    print("-" * 31)
+    details = []
+    for module in args.modules:
+        total, entries = profile_import(module)
+        if total is None:
+            print(f"{module:<20} {'not installed':>10}")
+            continue
+        print(f"{module:<20} {total:>10.1f}")
+        details.append((module, entries))
+
+    for module, entries in details:
+        print(f"\nHeaviest imports under {module} (self ms):")
+        for self_ms, cumulative_ms, name in sorted(entries, reverse=True)[:args.top]:
+            print(f"  {self_ms:>8.1f}  {name.strip()}  (cumulative {cumulative_ms:.1f})")
+
+
+if __name__ == "__main__":
+    main()
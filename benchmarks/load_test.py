@@ -0,0 +1,101 @@
+"""Load test for the scoring API: requests/sec and latency percentiles
+
+Each client thread keeps one HTTP/1.1 connection open for all its requests.
+Start the API first (python -m api), then:
+
+Usage: python benchmarks/load_test.py [--url http://127.0.0.1:8502]
+           [--endpoint predict|batch|history] [--concurrency 8] [--requests 200]
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlparse
+
+TEXTS = [
+    "Deadlines are approaching and I'm falling behind on everything.",
+    "Feeling good today, slept well and had a calm afternoon.",
+    "I've been working twelve hour days and can't switch off at night.",
+    "Tired but managing, the team has been supportive this week.",
+]
+
+
+def build_request(endpoint, i, batch_size):
+    if endpoint == "history":
+        return "GET", "/history?limit=20", None
+    item = {"text": TEXTS[i % len(TEXTS)], "screen": 2 + i % 10, "sleep": 4 + i % 5}
+    if endpoint == "batch":
+        items = [dict(item, screen=(item["screen"] + k) % 14) for k in range(batch_size)]
+        return "POST", "/predict/batch", {"items": items}
+    return "POST", "/predict", item
+
+
+def client(url, endpoint, requests, batch_size, latencies, statuses, lock):
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=120)
+    for i in range(requests):
+        method, path, payload = build_request(endpoint, i, batch_size)
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body else {}
+
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=120)
+            status = "error"
+        elapsed = time.perf_counter() - start
+
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] = statuses.get(status, 0) + 1
+    conn.close()
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8502")
+    parser.add_argument("--endpoint", choices=["predict", "batch", "history"], default="predict")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Total requests across all clients")
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args(argv)
+
+    url = urlparse(args.url)
+    latencies, statuses, lock = [], {}, threading.Lock()
+    per_client = max(1, args.requests // args.concurrency)
+
+    threads = [
+        threading.Thread(target=client, args=(url, args.endpoint, per_client, args.batch_size,
+                                              latencies, statuses, lock))
+        for _ in range(args.concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"{args.endpoint}: {total} requests, {args.concurrency} connections, {wall:.2f}s")
+    print(f"  throughput  {total / wall:8.1f} req/s")
+    for q in (50, 90, 95, 99):
+        print(f"  p{q:<10} {percentile(latencies, q) * 1000:8.1f} ms")
+    print(f"  max         {latencies[-1] * 1000 if latencies else 0:8.1f} ms")
+    print(f"  statuses    {statuses}")
+
+
+if __name__ == "__main__":
+    main()
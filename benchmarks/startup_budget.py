@@ -0,0 +1,73 @@
+"""Fail if the Home Dashboard's time-to-first-render exceeds a budget
+
+app.py is rendered in a fresh interpreter through Streamlit's AppTest
+harness, timed from interpreter start to the end of the first script run.
+The check also fails if the Home page imports torch, transformers or
+matplotlib, which are meant to load only on the pages that use them.
+
+Usage: python benchmarks/startup_budget.py [--budget 3.0] [--runs 3]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFERRED_MODULES = ("torch", "transformers", "matplotlib")
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=120)
+app.run()
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "loaded": [name for name in %r if name in sys.modules],
+    "errors": [str(error.value) for error in app.exception],
+}))
+""" % (DEFERRED_MODULES,)
+
+
+def measure_once():
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "App run failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=float, default=3.0, help="Seconds allowed for first render")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    runs = [measure_once() for _ in range(args.runs)]
+    seconds = [run["seconds"] for run in runs]
+    median = statistics.median(seconds)
+
+    print(f"Home first render: median {median:.2f}s, "
+          f"min {min(seconds):.2f}s, max {max(seconds):.2f}s (budget {args.budget:.2f}s)")
+
+    failures = []
+    if median > args.budget:
+        failures.append(f"first render {median:.2f}s is over the {args.budget:.2f}s budget")
+    for run in runs:
+        failures.extend(f"Home page error: {error}" for error in run["errors"])
+        failures.extend(f"{name} imported on the Home page" for name in run["loaded"])
+
+    for failure in sorted(set(failures)):
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
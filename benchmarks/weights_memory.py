@@ -0,0 +1,96 @@
+"""Startup time and per-process memory: from_pretrained vs memory-mapped bundle
+
+Starts several replicas per mode side by side. Once they are all loaded it
+reads /proc/<pid>/smaps_rollup (Linux only) for each one. USS, the memory
+unique to a process, is what each extra replica really costs. PSS splits
+the shared pages between the processes that map them.
+
+Usage: python benchmarks/weights_memory.py --bundle data/bert-bundle [--replicas 3]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from model import BurnoutPredictor
+predictor = BurnoutPredictor(weights_bundle=sys.argv[1] or None)
+loaded = time.perf_counter() - start
+predictor.predict("Warm-up text for the encoder", 6, 7)
+print(json.dumps({"load_seconds": loaded}), flush=True)
+sys.stdin.readline()
+"""
+
+
+def smaps_rollup(pid):
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    return values
+
+
+def run_mode(bundle, replicas):
+    children = [
+        subprocess.Popen(
+            [sys.executable, "-c", CHILD, bundle or ""],
+            cwd=ROOT,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        for _ in range(replicas)
+    ]
+    results = []
+    try:
+        for child in children:
+            line = child.stdout.readline()
+            while line and not line.startswith("{"):
+                line = child.stdout.readline()
+            if not line:
+                raise RuntimeError("Replica failed to load the model")
+            results.append(json.loads(line))
+
+        # Measure while every replica is alive, so sharing is visible
+        for child, result in zip(children, results):
+            memory = smaps_rollup(child.pid)
+            result["rss"] = memory.get("Rss", 0)
+            result["pss"] = memory.get("Pss", 0)
+            result["uss"] = memory.get("Private_Clean", 0) + memory.get("Private_Dirty", 0)
+    finally:
+        for child in children:
+            if child.poll() is None:
+                child.stdin.write("\n")
+                child.stdin.flush()
+                child.wait()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bundle", required=True, help="Directory written by `python -m weights prepare`")
+    parser.add_argument("--replicas", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    mb = 1024 * 1024
+    print(f"{'mode':<16} {'load s':>8} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8}  (mean of {args.replicas} replicas)")
+    for label, bundle in (("from_pretrained", None), ("mmap bundle", args.bundle)):
+        results = run_mode(bundle, args.replicas)
+
+        def mean(key):
+            return sum(r[key] for r in results) / len(results)
+
+        print(f"{label:<16} {mean('load_seconds'):>8.2f} {mean('rss') / mb:>8.0f} "
+              f"{mean('pss') / mb:>8.0f} {mean('uss') / mb:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
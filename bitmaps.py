@@ -0,0 +1,269 @@
+import os
+import numpy as np
+
+SURVEY_PATH = "mental_health_workplace_survey.csv"
+CACHE_PATH = "data/survey_bitmaps.npz"
+FILTER_COLUMNS = (
+    "Gender", "Country", "JobRole", "Department", "RemoteWork", "SalaryRange",
+    "HasMentalHealthSupport", "HasTherapyAccess",
+)
+MEASURE_COLUMNS = ("BurnoutLevel", "StressLevel", "SleepHours", "WorkHoursPerWeek", "BurnoutRisk")
+
+# Roaring layout: rows split into 2^16 blocks, each a sorted uint16 array
+# while sparse and a 1024-word bitset once it holds more than 4096 rows
+CONTAINER_BITS = 16
+CONTAINER_ROWS = 1 << CONTAINER_BITS
+ARRAY_MAX = 4096
+BITSET_WORDS = CONTAINER_ROWS // 64
+
+
+# Set bits per byte value, for counting bitset containers
+POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def _bitset_count(words):
+    return int(POPCOUNT[words.view(np.uint8)].sum())
+
+
+def _bitset_mask(words):
+    return np.unpackbits(words.view(np.uint8), bitorder="little")
+
+
+def _to_bitset(rows):
+    words = np.zeros(BITSET_WORDS, dtype=np.uint64)
+    np.bitwise_or.at(words, rows >> 6, np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64)))
+    return words
+
+
+def _bitset_rows(words):
+    return np.flatnonzero(_bitset_mask(words)).astype(np.uint16)
+
+
+def _compact(container):
+    """Pick the smaller representation for a container"""
+    if container.dtype == np.uint64:
+        count = _bitset_count(container)
+        if count <= ARRAY_MAX:
+            return _bitset_rows(container) if count else None
+        return container
+    if len(container) > ARRAY_MAX:
+        return _to_bitset(container)
+    return container if len(container) else None
+
+
+def _contains(words, rows):
+    return (words[rows >> 6] >> (rows & 63).astype(np.uint64)) & np.uint64(1) != 0
+
+
+class Bitmap:
+    """Compressed set of row numbers (roaring-style containers)"""
+
+    def __init__(self, containers=None):
+        self.containers = containers or {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Bitmap of a sorted array of row numbers"""
+        rows = np.asarray(rows, dtype=np.int64)
+        keys = rows >> CONTAINER_BITS
+        bounds = np.flatnonzero(np.diff(keys)) + 1
+        containers = {}
+        for part in np.split(rows, bounds):
+            if len(part):
+                low = (part & (CONTAINER_ROWS - 1)).astype(np.uint16)
+                containers[int(part[0] >> CONTAINER_BITS)] = _compact(low)
+        return cls(containers)
+
+    def __and__(self, other):
+        containers = {}
+        for key in self.containers.keys() & other.containers.keys():
+            a, b = self.containers[key], other.containers[key]
+            if a.dtype == np.uint64 and b.dtype == np.uint64:
+                # Left as a bitset: converting costs more than the sums it would save
+                result = a & b
+                if result.any():
+                    containers[key] = result
+                continue
+            elif a.dtype == np.uint64:
+                result = b[_contains(a, b)]
+            elif b.dtype == np.uint64:
+                result = a[_contains(b, a)]
+            else:
+                result = np.intersect1d(a, b, assume_unique=True)
+            result = _compact(result)
+            if result is not None:
+                containers[key] = result
+        return Bitmap(containers)
+
+    def __or__(self, other):
+        containers = dict(self.containers)
+        for key, b in other.containers.items():
+            a = containers.get(key)
+            if a is None:
+                containers[key] = b
+            elif a.dtype == np.uint64 or b.dtype == np.uint64:
+                a = a if a.dtype == np.uint64 else _to_bitset(a)
+                b = b if b.dtype == np.uint64 else _to_bitset(b)
+                containers[key] = a | b
+            else:
+                containers[key] = _compact(np.union1d(a, b))
+        return Bitmap(containers)
+
+    def __len__(self):
+        return sum(
+            _bitset_count(c) if c.dtype == np.uint64 else len(c)
+            for c in self.containers.values()
+        )
+
+    def rows(self):
+        """Sorted row numbers in the set"""
+        parts = [
+            (_bitset_rows(c) if c.dtype == np.uint64 else c).astype(np.int64) + (key << CONTAINER_BITS)
+            for key, c in sorted(self.containers.items())
+        ]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+    @property
+    def nbytes(self):
+        return sum(c.nbytes for c in self.containers.values())
+
+
+class SurveyIndex:
+    """Per-value bitmaps over the survey's categorical columns
+
+    A filter is {column: [values]}: values of one column are OR-ed, columns
+    are AND-ed, so any combination resolves with bitwise container ops
+    instead of boolean masks over every row. Measures are kept as compact
+    arrays and aggregated over the matching rows only.
+    """
+
+    def __init__(self, rows, bitmaps, measures):
+        self.rows = rows
+        self.bitmaps = bitmaps      # column -> {value: Bitmap}
+        # One float32 row per measure, so a container sums them in one product
+        self.measure_names = list(measures)
+        self.matrix = np.vstack([np.asarray(measures[name], dtype=np.float32) for name in self.measure_names]) \
+            if measures else np.zeros((0, rows), dtype=np.float32)
+        self.measures = dict(zip(self.measure_names, self.matrix))
+
+    @classmethod
+    def build(cls, path=SURVEY_PATH, chunksize=16 * CONTAINER_ROWS):
+        import pandas as pd
+
+        header = pd.read_csv(path, nrows=0).columns
+        filter_columns = [column for column in FILTER_COLUMNS if column in header]
+        measure_columns = [column for column in MEASURE_COLUMNS if column in header]
+
+        bitmaps = {column: {} for column in filter_columns}
+        measures = {column: [] for column in measure_columns}
+        rows = 0
+        # Chunks are whole containers, so each chunk's bitmaps just merge in
+        for chunk in pd.read_csv(path, usecols=filter_columns + measure_columns, chunksize=chunksize):
+            for column in filter_columns:
+                codes, uniques = pd.factorize(chunk[column].astype(str))
+                order = np.argsort(codes, kind="stable")
+                bounds = np.flatnonzero(np.diff(codes[order])) + 1
+                for group in np.split(order, bounds):
+                    value = uniques[codes[group[0]]]
+                    part = Bitmap.from_rows(group + rows)
+                    existing = bitmaps[column].get(value)
+                    bitmaps[column][value] = part if existing is None else existing | part
+            for column in measure_columns:
+                measures[column].append(chunk[column].to_numpy(dtype=np.float32))
+            rows += len(chunk)
+
+        measures = {
+            column: np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+            for column, parts in measures.items()
+        }
+        return cls(rows, bitmaps, measures)
+
+    @classmethod
+    def load(cls, path=SURVEY_PATH, cache_path=CACHE_PATH):
+        """Load the saved index, rebuilding it if the survey changed"""
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            bitmaps, measures = {}, {}
+            with np.load(cache_path) as cached:
+                rows = int(cached["__rows__"])
+                for name in cached.files:
+                    kind, _, rest = name.partition(":")
+                    if kind == "measure":
+                        measures[rest] = cached[name]
+                    elif kind == "bitmap":
+                        column, value, key = rest.split("\x1f")
+                        values = bitmaps.setdefault(column, {})
+                        values.setdefault(value, Bitmap()).containers[int(key)] = cached[name]
+            return cls(rows, bitmaps, measures)
+
+        index = cls.build(path)
+        index.save(cache_path)
+        return index
+
+    def save(self, cache_path=CACHE_PATH):
+        arrays = {"__rows__": np.array(self.rows)}
+        for column, values in self.bitmaps.items():
+            for value, bitmap in values.items():
+                for key, container in bitmap.containers.items():
+                    arrays[f"bitmap:{column}\x1f{value}\x1f{key}"] = container
+        for column, values in self.measures.items():
+            arrays[f"measure:{column}"] = values
+
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp_path = cache_path + ".tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, cache_path)
+
+    def values(self, column):
+        return sorted(self.bitmaps.get(column, {}))
+
+    def select(self, filters):
+        """Bitmap of rows matching {column: [values]}, or None for all rows"""
+        selected = None
+        for column, values in filters.items():
+            if not values:
+                continue
+            column_bitmaps = self.bitmaps.get(column, {})
+            matches = Bitmap()
+            for value in values:
+                if value in column_bitmaps:
+                    matches = matches | column_bitmaps[value]
+            selected = matches if selected is None else selected & matches
+        return selected
+
+    def _totals(self, selected):
+        """(row count, per-measure sums) over a bitmap, container by container"""
+        if selected is None:
+            return self.rows, self.matrix.sum(axis=1, dtype=np.float64)
+        count, sums = 0, np.zeros(len(self.measure_names))
+        for key, container in selected.containers.items():
+            block = self.matrix[:, key << CONTAINER_BITS:(key + 1) << CONTAINER_BITS]
+            if container.dtype == np.uint64:
+                weights = _bitset_mask(container)[:block.shape[1]].astype(np.float32)
+                count += int(weights.sum())
+                sums += block @ weights
+            else:
+                count += len(container)
+                sums += block[:, container].sum(axis=1, dtype=np.float64)
+        return count, sums
+
+    def aggregate(self, selected=None):
+        """Row count and mean of every measure over a selection"""
+        count, sums = self._totals(selected)
+        result = {"count": count}
+        for name, total in zip(self.measure_names, sums):
+            result[name] = float(total / count) if count else None
+        return result
+
+    def breakdown(self, column, selected=None, measure="BurnoutLevel"):
+        """{value: (count, mean measure)} over a selection, split by column"""
+        position = self.measure_names.index(measure)
+        result = {}
+        for value, bitmap in sorted(self.bitmaps.get(column, {}).items()):
+            count, sums = self._totals(bitmap if selected is None else bitmap & selected)
+            if count:
+                result[value] = (count, float(sums[position] / count))
+        return result
+
+    @property
+    def nbytes(self):
+        return sum(b.nbytes for values in self.bitmaps.values() for b in values.values())
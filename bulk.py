@@ -0,0 +1,327 @@
+import argparse
+import csv
+import io
+import json
+import math
+import os
+import sys
+import time
+
+TEXT_FIELDS = ("text", "text_preview")
+SCREEN_FIELDS = ("screen", "screen_hours")
+SLEEP_FIELDS = ("sleep", "sleep_hours")
+OUTPUT_FIELDS = ["row", "id", "burnout_score", "emotional_score", "error"]
+# Set on a record that could not be parsed; it is reported, not scored
+ERROR_KEY = "_error"
+
+
+def _field(record, names, default=None):
+    for name in names:
+        if record.get(name) not in (None, ""):
+            return record[name]
+    return default
+
+
+class _LineSource:
+    """Binary line iterator that remembers the byte offset after each line"""
+
+    def __init__(self, f):
+        self.f = f
+        self.offset = f.tell()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.f.readline()
+        if not line:
+            raise StopIteration
+        self.offset = self.f.tell()
+        return line.decode("utf-8")
+
+
+def _is_csv(path):
+    return path.lower().endswith(".csv")
+
+
+def iter_records(f, path, start_offset=None, end_offset=None):
+    """Yield (record, offset_after_record) from a JSONL or CSV file
+
+    Offsets let a caller checkpoint and later seek straight back to the
+    next unread record instead of re-reading the file from the top. A line
+    that cannot be parsed is yielded as {ERROR_KEY: message} so one bad
+    record does not stop the file.
+    """
+    f.seek(0)
+    header = None
+    if _is_csv(path):
+        header = next(csv.reader([f.readline().decode("utf-8-sig")]))
+
+    if start_offset is not None:
+        f.seek(start_offset)
+    lines = _LineSource(f)
+
+    if header is not None:
+        reader = csv.reader(lines)
+        while True:
+            try:
+                values = next(reader)
+            except StopIteration:
+                break
+            except csv.Error as e:
+                yield {ERROR_KEY: f"invalid CSV row: {e}"}, lines.offset
+            else:
+                if values:
+                    yield dict(zip(header, values)), lines.offset
+            if end_offset is not None and lines.offset >= end_offset:
+                break
+    else:
+        for line in lines:
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    record = {ERROR_KEY: f"invalid JSON: {e}"}
+                if not isinstance(record, dict):
+                    record = {ERROR_KEY: "record is not a JSON object"}
+                yield record, lines.offset
+            if end_offset is not None and lines.offset >= end_offset:
+                break
+
+
+class ResultWriter:
+    """Append scored rows to a JSONL or CSV file"""
+
+    def __init__(self, path, offset=0):
+        self.path = path
+        self.is_csv = _is_csv(path)
+        self.f = open(path, "ab" if os.path.exists(path) else "wb")
+        # Drop anything written after the last checkpoint
+        self.f.truncate(offset)
+        self.f.seek(offset)
+        if self.is_csv and offset == 0:
+            self._write_csv(OUTPUT_FIELDS)
+
+    def _write_csv(self, values):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(values)
+        self.f.write(buffer.getvalue().encode("utf-8"))
+
+    def write(self, rows):
+        for row in rows:
+            if self.is_csv:
+                self._write_csv([row.get(field, "") for field in OUTPUT_FIELDS])
+            else:
+                self.f.write((json.dumps(row, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def flush(self):
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        return self.f.tell()
+
+    def close(self):
+        self.f.close()
+
+
+def load_checkpoint(path):
+    if path and os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return None
+
+
+def save_checkpoint(path, state):
+    """Atomically replace the checkpoint file"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _parse(record):
+    """(text, screen, sleep) of a record, or ValueError if it is malformed"""
+    if ERROR_KEY in record:
+        raise ValueError(record[ERROR_KEY])
+    text = str(_field(record, TEXT_FIELDS, ""))
+    values = []
+    for label, names in (("screen", SCREEN_FIELDS), ("sleep", SLEEP_FIELDS)):
+        # A missing value is an error, not zero: zero hours scores as maximum risk
+        value = _field(record, names)
+        if value is None:
+            raise ValueError(f"missing {label} value")
+        try:
+            values.append(float(value))
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid {label} value: {value!r}") from None
+        if not math.isfinite(values[-1]):
+            raise ValueError(f"invalid {label} value: {value!r}")
+    return text, values[0], values[1]
+
+
+def score_batch(predictor, batch):
+    """Score a list of (row_number, record) pairs
+
+    Malformed records get a row with an error message instead of a score,
+    in their original position, so the batch and the job carry on.
+    """
+    parsed, rows = [], []
+    for row_number, record in batch:
+        row = {"row": row_number, "id": record.get("id", record.get("EmployeeID", ""))}
+        try:
+            parsed.append((row, _parse(record)))
+        except ValueError as e:
+            row["error"] = str(e)
+        rows.append(row)
+
+    if parsed:
+        results = predictor.predict_batch(
+            [text for _, (text, _, _) in parsed],
+            [screen for _, (_, screen, _) in parsed],
+            [sleep for _, (_, _, sleep) in parsed],
+        )
+        for (row, _), (score, emotional) in zip(parsed, results):
+            row["burnout_score"] = score
+            row["emotional_score"] = emotional
+    return rows
+
+
+def score_file(predictor, input_path, output_path, batch_size=32, checkpoint_path=None,
+               report_every=5.0, log=sys.stderr):
+    """Score every record of input_path into output_path, resuming if possible"""
+    checkpoint_path = checkpoint_path or output_path + ".ckpt"
+    state = load_checkpoint(checkpoint_path)
+
+    if state and state.get("input") != os.path.abspath(input_path):
+        raise ValueError(f"Checkpoint {checkpoint_path} belongs to {state.get('input')}")
+    if state is None:
+        state = {"input": os.path.abspath(input_path), "rows_done": 0, "rows_failed": 0,
+                 "input_offset": None, "output_offset": 0, "finished": False}
+    elif state.get("finished"):
+        print(f"Already finished: {state['rows_done']} rows", file=log)
+        return state
+    else:
+        print(f"Resuming after {state['rows_done']} rows", file=log)
+
+    writer = ResultWriter(output_path, state["output_offset"])
+    started = time.time()
+    last_report = started
+    scored_now = 0
+
+    def commit(batch, offset):
+        nonlocal scored_now
+        rows = score_batch(predictor, batch)
+        writer.write(rows)
+        state["rows_failed"] = state.get("rows_failed", 0) + sum("error" in row for row in rows)
+        state["output_offset"] = writer.flush()
+        state["input_offset"] = offset
+        state["rows_done"] += len(batch)
+        save_checkpoint(checkpoint_path, state)
+        scored_now += len(batch)
+
+    try:
+        with open(input_path, "rb") as f:
+            batch = []
+            offset = state["input_offset"]
+            for record, offset in iter_records(f, input_path, state["input_offset"]):
+                batch.append((state["rows_done"] + len(batch), record))
+                if len(batch) < batch_size:
+                    continue
+
+                commit(batch, offset)
+                batch = []
+
+                now = time.time()
+                if now - last_report >= report_every:
+                    rate = scored_now / (now - started)
+                    print(f"{state['rows_done']} rows scored ({rate:.1f} rows/sec)", file=log)
+                    last_report = now
+
+            if batch:
+                commit(batch, offset)
+    finally:
+        writer.close()
+
+    state["finished"] = True
+    save_checkpoint(checkpoint_path, state)
+
+    elapsed = max(time.time() - started, 1e-9)
+    print(f"Done: {state['rows_done']} rows ({scored_now / elapsed:.1f} rows/sec), "
+          f"{state.get('rows_failed', 0)} malformed", file=log)
+    return state
+
+
+def rescore_history(predictor, output_path, history_path="data/history.csv", store=None,
+                    batch_size=32, log=sys.stderr):
+    """Re-score saved history rows, running BERT once per unique stored text"""
+    from textstore import TextStore
+    store = store or TextStore()
+
+    rows = []
+    skipped = 0
+    with open(history_path, newline="", encoding="utf-8") as f:
+        for row_number, record in enumerate(csv.DictReader(f)):
+            digest = record.get("text_hash")
+            try:
+                _, screen, sleep = _parse(record)
+            except ValueError:
+                digest = None
+            if digest and digest in store:
+                rows.append((row_number, digest, screen, sleep))
+            else:
+                skipped += 1
+
+    # Duplicates share one text read and one slot in a forward pass
+    unique = list(dict.fromkeys(digest for _, digest, _, _ in rows))
+    emotional = {}
+    for start in range(0, len(unique), batch_size):
+        digests = unique[start:start + batch_size]
+        scores = predictor.emotional_scores([store.get(digest) for digest in digests])
+        emotional.update(zip(digests, scores))
+
+    results = predictor.score_rows(
+        [emotional[digest] for _, digest, _, _ in rows],
+        [screen for _, _, screen, _ in rows],
+        [sleep for _, _, _, sleep in rows],
+    )
+
+    writer = ResultWriter(output_path)
+    try:
+        writer.write(
+            {"row": row_number, "id": digest, "burnout_score": score, "emotional_score": emotional_score}
+            for (row_number, digest, _, _), (score, emotional_score) in zip(rows, results)
+        )
+        writer.flush()
+    finally:
+        writer.close()
+
+    print(f"Re-scored {len(rows)} rows from {len(unique)} unique texts "
+          f"({skipped} rows without a stored text or with invalid values)", file=log)
+    return len(rows), len(unique)
+
+
+def main(get_predictor, argv=None):
+    """Command-line entry point, run as `python -m model score ...`"""
+    parser = argparse.ArgumentParser(prog="python -m model")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    score = commands.add_parser("score", help="Bulk-score a JSONL or CSV file")
+    score.add_argument("input", help="JSONL or CSV with text, screen and sleep fields")
+    score.add_argument("output", help="Results file (.jsonl or .csv)")
+    score.add_argument("--batch-size", type=int, default=32)
+    score.add_argument("--checkpoint", help="Checkpoint file (default: OUTPUT.ckpt)")
+    score.add_argument("--report-every", type=float, default=5.0,
+                       help="Seconds between rows/sec reports")
+
+    rescore = commands.add_parser("rescore", help="Re-score saved history by text hash")
+    rescore.add_argument("output", help="Results file (.jsonl or .csv); id is the text hash")
+    rescore.add_argument("--history", default="data/history.csv")
+    rescore.add_argument("--batch-size", type=int, default=32)
+
+    args = parser.parse_args(argv)
+    if args.command == "score":
+        score_file(get_predictor(), args.input, args.output, args.batch_size,
+                   args.checkpoint, args.report_every)
+    elif args.command == "rescore":
+        rescore_history(get_predictor(), args.output, args.history, batch_size=args.batch_size)
@@ -0,0 +1,143 @@
+import json
+import os
+import re
+import threading
+import time
+import numpy as np
+
+# Risk thresholds used across the app (moderate / high)
+RISK_THRESHOLDS = (40.0, 70.0)
+CALIBRATION_PATH = "data/cascade.json"
+# Used until calibrate() has saved a fit
+DEFAULT_PRIOR = 0.05
+DEFAULT_PER_HIT = 0.02
+
+# Words that signal strain; a hit raises the cheap emotional estimate
+STRESS_LEXICON = frozenset("""
+    anxious anxiety angry burnout burned burnt cant can't collapse collapsed cry crying
+    deadline deadlines depressed depression drained dread empty escape exhausted exhaustion
+    fail failing falling frustrated hopeless insomnia irritable lonely numb overwhelmed
+    overworked panic pressure sick sleepless stress stressed struggling suicide suicidal
+    tired unmotivated useless worried worthless
+""".split())
+
+TOKEN_PATTERN = re.compile(r"[a-z']+")
+
+
+def lexical_hits(text):
+    """Count stress-lexicon words in a text"""
+    return sum(1 for token in TOKEN_PATTERN.findall(text.lower()) if token in STRESS_LEXICON)
+
+
+def load_calibration(path=CALIBRATION_PATH):
+    """{"emotional_prior", "emotional_per_hit", ...} saved by calibrate()"""
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+class CascadePredictor:
+    """Two-tier scorer: lexical/behavioral first, BERT only near a threshold
+
+    The cheap tier estimates the emotional score from stress-word hits and
+    combines it with the screen and sleep factors using the same
+    0.45/0.35/0.20 weights. If that score lands within `band` points of
+    the 40% or 70% thresholds the request is escalated to the full BERT
+    path; otherwise the cheap score is returned as is. Unless given, the
+    prior and per-hit weight come from the fit saved in data/cascade.json.
+    """
+
+    def __init__(self, predictor, band=5.0, emotional_prior=None, emotional_per_hit=None,
+                 calibration=None):
+        self.predictor = predictor
+        self.band = band
+        fit = calibration if calibration is not None else load_calibration()
+        self.emotional_prior = fit.get("emotional_prior", DEFAULT_PRIOR) \
+            if emotional_prior is None else emotional_prior
+        self.emotional_per_hit = fit.get("emotional_per_hit", DEFAULT_PER_HIT) \
+            if emotional_per_hit is None else emotional_per_hit
+
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = 0
+            self.escalations = 0
+            self.cheap_seconds = 0.0
+            self.full_seconds = 0.0
+
+    def calibrate(self, texts, path=CALIBRATION_PATH):
+        """Fit the cheap emotional estimate to BERT's scores and save it to path"""
+        texts = [text for text in texts if text and text.strip()]
+        if len(texts) < 2:
+            return self
+
+        hits = np.array([lexical_hits(text) for text in texts], dtype=float)
+        emotional = np.array([self.predictor.analyze_sentiment(text)[0] for text in texts], dtype=float)
+
+        if np.ptp(hits) > 0:
+            per_hit, prior = np.polyfit(hits, emotional, 1)
+        else:
+            per_hit, prior = 0.0, emotional.mean()
+        self.emotional_prior = float(np.clip(prior, 0, 1))
+        self.emotional_per_hit = float(max(per_hit, 0.0))
+
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"emotional_prior": self.emotional_prior,
+                           "emotional_per_hit": self.emotional_per_hit,
+                           "texts": len(texts)}, f, indent=2)
+            os.replace(tmp_path, path)
+        return self
+
+    def cheap_score(self, text, screen_hours, sleep_hours):
+        """(risk percentage, estimated emotional score) without BERT"""
+        emotional = min(self.emotional_prior + self.emotional_per_hit * lexical_hits(text), 1.0)
+        risk_score = (
+            0.45 * emotional +
+            0.35 * self.predictor.calculate_screen_factor(screen_hours) +
+            0.20 * self.predictor.calculate_sleep_factor(sleep_hours)
+        )
+        return round(min(max(risk_score, 0), 1) * 100, 2), round(emotional, 4)
+
+    def needs_escalation(self, score):
+        return any(abs(score - threshold) <= self.band for threshold in RISK_THRESHOLDS)
+
+    def predict(self, text, screen_hours, sleep_hours, full_predict=None):
+        """Same (score, emotional_score) as BurnoutPredictor.predict, tiered
+
+        full_predict overrides how escalated requests reach BERT (e.g.
+        through a scheduler); it defaults to the wrapped predictor.
+        """
+        started = time.perf_counter()
+        score, emotional = self.cheap_score(text, screen_hours, sleep_hours)
+        cheap_done = time.perf_counter()
+
+        escalated = self.needs_escalation(score)
+        if escalated:
+            score, emotional = (full_predict or self.predictor.predict)(text, screen_hours, sleep_hours)
+
+        with self._lock:
+            self.requests += 1
+            self.cheap_seconds += cheap_done - started
+            if escalated:
+                self.escalations += 1
+                self.full_seconds += time.perf_counter() - cheap_done
+        return score, emotional
+
+    def stats(self):
+        """Escalation rate and mean latency per tier"""
+        with self._lock:
+            requests = max(self.requests, 1)
+            return {
+                "requests": self.requests,
+                "escalations": self.escalations,
+                "escalation_rate": self.escalations / requests,
+                "cheap_ms_avg": 1000 * self.cheap_seconds / requests,
+                "full_ms_avg": 1000 * self.full_seconds / max(self.escalations, 1),
+                "cascade_ms_avg": 1000 * (self.cheap_seconds + self.full_seconds) / requests,
+            }
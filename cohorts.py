@@ -0,0 +1,105 @@
+import os
+import numpy as np
+
+SURVEY_PATH = "mental_health_workplace_survey.csv"
+CACHE_PATH = "data/cohorts.npz"
+COHORT_COLUMNS = ("Department", "JobRole", "Country", "RemoteWork")
+ALL_KEY = "__all__"
+
+# Exports above this size are summarized as histograms instead of sorted arrays
+EXACT_MAX_BYTES = 64 * 1024 * 1024
+HISTOGRAM_BINS = 1000
+
+
+def cohort_key(column, value):
+    return f"{column}={value}"
+
+
+class CohortPercentiles:
+    """Burnout score distribution per survey cohort, precomputed for lookups
+
+    Survey BurnoutLevel (0-10) is scaled to the 0-100 risk percentage that
+    predict_burnout returns. Small surveys keep one sorted array per cohort
+    (exact percentile by binary search); large exports keep a cumulative
+    histogram per cohort instead, which is built in one streaming pass,
+    has fixed size, and answers a lookup with a single index.
+    """
+
+    def __init__(self, kind, tables):
+        self.kind = kind
+        self.tables = tables
+
+    @classmethod
+    def build(cls, path=SURVEY_PATH, exact=None, chunksize=500000):
+        import pandas as pd
+
+        if exact is None:
+            exact = os.path.getsize(path) <= EXACT_MAX_BYTES
+
+        parts = {}
+        histograms = {}
+        reader = pd.read_csv(path, usecols=[*COHORT_COLUMNS, "BurnoutLevel"], chunksize=chunksize)
+
+        for chunk in reader:
+            chunk = chunk.dropna(subset=["BurnoutLevel"])
+            scores = np.clip(chunk["BurnoutLevel"].to_numpy(dtype=np.float32) * 10, 0, 100)
+            groups = [(ALL_KEY, np.ones(len(chunk), dtype=bool))]
+            for column in COHORT_COLUMNS:
+                values = chunk[column].astype(str).to_numpy()
+                groups.extend((cohort_key(column, value), values == value) for value in np.unique(values))
+
+            if exact:
+                for key, mask in groups:
+                    parts.setdefault(key, []).append(scores[mask])
+            else:
+                bins = np.minimum((scores / 100 * HISTOGRAM_BINS).astype(np.int64), HISTOGRAM_BINS - 1)
+                for key, mask in groups:
+                    counts = np.bincount(bins[mask], minlength=HISTOGRAM_BINS)
+                    histograms[key] = histograms.get(key, 0) + counts
+
+        if exact:
+            tables = {key: np.sort(np.concatenate(arrays)) for key, arrays in parts.items()}
+            return cls("sorted", tables)
+        return cls("histogram", {key: np.cumsum(counts) for key, counts in histograms.items()})
+
+    @classmethod
+    def load(cls, path=SURVEY_PATH, cache_path=CACHE_PATH):
+        """Load the precomputed tables, rebuilding them if the survey changed"""
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+            with np.load(cache_path) as cached:
+                kind = str(cached["__kind__"])
+                tables = {key: cached[key] for key in cached.files if key != "__kind__"}
+            return cls(kind, tables)
+
+        cohorts = cls.build(path)
+        cohorts.save(cache_path)
+        return cohorts
+
+    def save(self, cache_path=CACHE_PATH):
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        tmp_path = cache_path + ".tmp.npz"
+        np.savez(tmp_path, __kind__=np.array(self.kind), **self.tables)
+        os.replace(tmp_path, cache_path)
+
+    def values(self, column):
+        """Cohort values available for a survey column"""
+        prefix = cohort_key(column, "")
+        return sorted(key[len(prefix):] for key in self.tables if key.startswith(prefix))
+
+    def size(self, column=None, value=None):
+        table = self.tables.get(ALL_KEY if column is None else cohort_key(column, value))
+        if table is None or len(table) == 0:
+            return 0
+        return int(table[-1]) if self.kind == "histogram" else len(table)
+
+    def percentile(self, score, column=None, value=None):
+        """Share of the cohort (0-100) with a burnout score at or below score"""
+        table = self.tables.get(ALL_KEY if column is None else cohort_key(column, value))
+        if table is None or len(table) == 0:
+            return None
+
+        if self.kind == "histogram":
+            bin_index = min(max(int(score / 100 * HISTOGRAM_BINS), 0), HISTOGRAM_BINS - 1)
+            return 100.0 * table[bin_index] / table[-1]
+
+        return 100.0 * np.searchsorted(table, score, side="right") / len(table)
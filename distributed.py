@@ -0,0 +1,420 @@
+"""Coordinator/worker bulk scoring over a shared work queue
+
+The coordinator splits an input file (JSONL, or CSV without multi-line
+fields) into byte-range shards on line boundaries and publishes them.
+Workers on any node claim a shard under a lease, score it in batches with
+BurnoutPredictor and renew the lease after every batch. A lease that is
+not renewed expires and the shard goes to another worker.
+
+Every claim gets a new fencing token. A worker writes its results to a
+file private to its attempt and, when done, completes the shard: the
+queue checks the token and renames the file into place in one
+transaction, so a worker whose lease was taken over cannot publish, and
+each shard's results land exactly once. The coordinator merges the shard
+files in order into the final output.
+
+Malformed records become error rows (see bulk.score_batch). A shard that
+still fails, by raising or by killing its workers, goes back to the queue
+until it has been claimed max_attempts times and is then marked failed;
+the coordinator reports failed shards instead of merging a partial output.
+
+SQLiteWorkQueue is the local stand-in. Its database must be on storage
+every node can lock reliably (a local disk for single-host tests). Other
+backends implement the WorkQueue methods.
+
+    python -m distributed coordinator checkins.jsonl scores.csv --queue data/queue.sqlite
+    python -m distributed worker --queue data/queue.sqlite      # on each node
+"""
+import abc
+import argparse
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from bulk import ResultWriter, _is_csv, iter_records, score_batch
+
+QUEUE_PATH = "data/queue.sqlite"
+MAX_ATTEMPTS = 3
+
+
+class Lease:
+    """A claimed shard; token fences out earlier holders of the same shard"""
+
+    def __init__(self, job, shard, input_path, start, end, token, result_dir):
+        self.job = job
+        self.shard = shard
+        self.input_path = input_path
+        self.start = start
+        self.end = end
+        self.token = token
+        self.result_dir = result_dir
+
+    @property
+    def result_path(self):
+        return os.path.join(self.result_dir, f"shard-{self.shard:05d}.jsonl")
+
+    @property
+    def attempt_path(self):
+        return f"{self.result_path}.{self.token}.tmp"
+
+
+class WorkQueue(abc.ABC):
+    """Shard queue shared by the coordinator and workers
+
+    Every method the coordinator, merge() and run_worker call is abstract,
+    so a backend that misses one fails when it is instantiated rather than
+    halfway through a job.
+    """
+
+    @abc.abstractmethod
+    def publish(self, job, input_path, output_path, shards, result_dir):
+        """Record a job and its (start, end) byte-range shards as pending"""
+
+    @abc.abstractmethod
+    def claim(self, worker, lease_seconds):
+        """Lease the next pending or expired shard, or return None"""
+
+    @abc.abstractmethod
+    def renew(self, lease, lease_seconds):
+        """Extend a lease; False if it was lost to another worker"""
+
+    @abc.abstractmethod
+    def complete(self, lease):
+        """Publish the attempt's results; False if the lease was lost"""
+
+    @abc.abstractmethod
+    def fail(self, lease, error):
+        """Give the shard back after an error, or mark it failed once out of attempts"""
+
+    @abc.abstractmethod
+    def status(self, job):
+        """Shard counts by state plus retries, as a dict"""
+
+    @abc.abstractmethod
+    def failures(self, job):
+        """{shard: error} for the job's failed shards"""
+
+    @abc.abstractmethod
+    def remaining(self):
+        """Shards neither done nor failed, across all jobs"""
+
+    @abc.abstractmethod
+    def job(self, job):
+        """{"input", "output", "result_dir", "shards", "merged"}; KeyError if unknown"""
+
+    @abc.abstractmethod
+    def mark_merged(self, job):
+        """Record that the job's output has been merged"""
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Work queue in a SQLite database, safe across local processes"""
+
+    def __init__(self, path=QUEUE_PATH, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._transaction() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                job TEXT PRIMARY KEY, input TEXT, output TEXT, result_dir TEXT,
+                shards INTEGER, created REAL, merged INTEGER DEFAULT 0)""")
+            db.execute("""CREATE TABLE IF NOT EXISTS shards (
+                job TEXT, shard INTEGER, start_offset INTEGER, end_offset INTEGER,
+                state TEXT DEFAULT 'pending', owner TEXT, lease_expires REAL,
+                token INTEGER DEFAULT 0, attempts INTEGER DEFAULT 0, error TEXT,
+                PRIMARY KEY (job, shard))""")
+
+    @contextmanager
+    def _transaction(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            # Take the write lock up front so claims never race
+            db.execute("BEGIN IMMEDIATE")
+            yield db
+            db.execute("COMMIT")
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def publish(self, job, input_path, output_path, shards, result_dir):
+        with self._transaction() as db:
+            db.execute("INSERT INTO jobs (job, input, output, result_dir, shards, created) VALUES (?, ?, ?, ?, ?, ?)",
+                       (job, input_path, output_path, result_dir, len(shards), time.time()))
+            db.executemany("INSERT INTO shards (job, shard, start_offset, end_offset) VALUES (?, ?, ?, ?)",
+                           [(job, i, start, end) for i, (start, end) in enumerate(shards)])
+
+    def claim(self, worker, lease_seconds=60.0):
+        now = time.time()
+        with self._transaction() as db:
+            # Expired leases out of attempts: their workers keep dying on this shard
+            db.execute(
+                """UPDATE shards SET state = 'failed', lease_expires = NULL,
+                   error = COALESCE(error, 'lease expired on every attempt')
+                   WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?""",
+                (now, self.max_attempts))
+            row = db.execute(
+                """SELECT s.job, s.shard, j.input, s.start_offset, s.end_offset, s.token, j.result_dir
+                   FROM shards s JOIN jobs j ON j.job = s.job
+                   WHERE s.state = 'pending' OR (s.state = 'leased' AND s.lease_expires < ?)
+                   ORDER BY j.created, s.shard LIMIT 1""", (now,)).fetchone()
+            if row is None:
+                return None
+            job, shard, input_path, start, end, token, result_dir = row
+            db.execute(
+                """UPDATE shards SET state = 'leased', owner = ?, lease_expires = ?,
+                   token = token + 1, attempts = attempts + 1 WHERE job = ? AND shard = ?""",
+                (worker, now + lease_seconds, job, shard))
+        return Lease(job, shard, input_path, start, end, token + 1, result_dir)
+
+    def renew(self, lease, lease_seconds=60.0):
+        with self._transaction() as db:
+            updated = db.execute(
+                """UPDATE shards SET lease_expires = ?
+                   WHERE job = ? AND shard = ? AND token = ? AND state = 'leased'""",
+                (time.time() + lease_seconds, lease.job, lease.shard, lease.token)).rowcount
+        return updated == 1
+
+    def complete(self, lease):
+        with self._transaction() as db:
+            updated = db.execute(
+                """UPDATE shards SET state = 'done', lease_expires = NULL
+                   WHERE job = ? AND shard = ? AND token = ? AND state = 'leased'""",
+                (lease.job, lease.shard, lease.token)).rowcount
+            if updated != 1:
+                return False
+            # Renamed while the write lock is held: only the current token publishes
+            os.replace(lease.attempt_path, lease.result_path)
+        return True
+
+    def fail(self, lease, error):
+        with self._transaction() as db:
+            db.execute(
+                """UPDATE shards SET error = ?, lease_expires = NULL,
+                   state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END
+                   WHERE job = ? AND shard = ? AND token = ? AND state = 'leased'""",
+                (error, self.max_attempts, lease.job, lease.shard, lease.token))
+
+    def status(self, job):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            counts = dict(db.execute("SELECT state, COUNT(*) FROM shards WHERE job = ? GROUP BY state", (job,)))
+            retries = db.execute("SELECT COALESCE(SUM(attempts - 1), 0) FROM shards WHERE job = ? AND attempts > 1",
+                                 (job,)).fetchone()[0]
+        finally:
+            db.close()
+        total = sum(counts.values())
+        return {"shards": total, "done": counts.get("done", 0), "leased": counts.get("leased", 0),
+                "pending": counts.get("pending", 0), "failed": counts.get("failed", 0), "retries": retries}
+
+    def failures(self, job):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            return dict(db.execute("SELECT shard, error FROM shards WHERE job = ? AND state = 'failed'", (job,)))
+        finally:
+            db.close()
+
+    def remaining(self):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            return db.execute("SELECT COUNT(*) FROM shards WHERE state NOT IN ('done', 'failed')").fetchone()[0]
+        finally:
+            db.close()
+
+    def job(self, job):
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            row = db.execute("SELECT input, output, result_dir, shards, merged FROM jobs WHERE job = ?",
+                             (job,)).fetchone()
+        finally:
+            db.close()
+        if row is None:
+            raise KeyError(job)
+        return dict(zip(("input", "output", "result_dir", "shards", "merged"), row))
+
+    def mark_merged(self, job):
+        with self._transaction() as db:
+            db.execute("UPDATE jobs SET merged = 1 WHERE job = ?", (job,))
+
+
+def split_shards(input_path, shard_bytes):
+    """[(start, end)] byte ranges covering every record, cut at line ends"""
+    size = os.path.getsize(input_path)
+    with open(input_path, "rb") as f:
+        # A CSV header belongs to no shard; iter_records re-reads it
+        if _is_csv(input_path):
+            f.readline()
+        start = f.tell()
+        shards = []
+        while start < size:
+            f.seek(min(start + shard_bytes, size))
+            if f.tell() < size:
+                f.readline()
+            end = f.tell()
+            shards.append((start, end))
+            start = end
+    return shards
+
+
+def publish_file(queue, input_path, output_path, shard_bytes=64 * 1024 * 1024):
+    """Split input_path into shards and publish them as a new job"""
+    input_path = os.path.abspath(input_path)
+    output_path = os.path.abspath(output_path)
+    job = f"{os.path.basename(input_path)}-{int(time.time() * 1000)}"
+    result_dir = output_path + ".shards"
+    os.makedirs(result_dir, exist_ok=True)
+    shards = split_shards(input_path, shard_bytes)
+    queue.publish(job, input_path, output_path, shards, result_dir)
+    return job, len(shards)
+
+
+def score_shard(queue, lease, predictor, batch_size=32, lease_seconds=60.0):
+    """Score one leased shard; False if the lease was lost on the way"""
+    rows = 0
+    with open(lease.input_path, "rb") as f, open(lease.attempt_path, "w", encoding="utf-8") as out:
+        batch = []
+        for record, _ in iter_records(f, lease.input_path, lease.start, lease.end):
+            batch.append((rows + len(batch), record))
+            if len(batch) < batch_size:
+                continue
+            for row in score_batch(predictor, batch):
+                out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            rows += len(batch)
+            batch = []
+            if not queue.renew(lease, lease_seconds):
+                break
+        else:
+            if batch:
+                for row in score_batch(predictor, batch):
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+            if queue.complete(lease):
+                return True
+
+    # Lease lost: another worker owns the shard now
+    if os.path.exists(lease.attempt_path):
+        os.remove(lease.attempt_path)
+    return False
+
+
+def run_worker(queue, get_predictor, batch_size=32, lease_seconds=60.0, idle_exit=True,
+               poll_seconds=2.0, log=sys.stderr):
+    """Claim and score shards until none are left (or forever)"""
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    predictor = None
+    scored = 0
+    while True:
+        lease = queue.claim(worker, lease_seconds)
+        if lease is None:
+            # Leased shards may still expire and come back, so wait for those
+            if idle_exit and not queue.remaining():
+                break
+            time.sleep(poll_seconds)
+            continue
+
+        predictor = predictor or get_predictor()
+        started = time.time()
+        try:
+            done = score_shard(queue, lease, predictor, batch_size, lease_seconds)
+        except Exception as e:
+            # Keep the worker alive; the shard is retried elsewhere or marked failed
+            print(f"[{worker}] {lease.job} shard {lease.shard} failed: {e!r}", file=log)
+            if os.path.exists(lease.attempt_path):
+                os.remove(lease.attempt_path)
+            queue.fail(lease, repr(e))
+            continue
+        if done:
+            scored += 1
+            print(f"[{worker}] {lease.job} shard {lease.shard} done in {time.time() - started:.1f}s", file=log)
+        else:
+            print(f"[{worker}] {lease.job} shard {lease.shard} lost its lease", file=log)
+    return scored
+
+
+def merge(queue, job):
+    """Concatenate the finished shards in order into the job's output"""
+    info = queue.job(job)
+    status = queue.status(job)
+    if status["done"] != info["shards"]:
+        raise RuntimeError(f"{job}: {status['done']}/{info['shards']} shards done")
+
+    output_path = info["output"]
+    tmp_path = output_path + ".tmp" + os.path.splitext(output_path)[1]
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    writer = ResultWriter(tmp_path)
+    rows = 0
+    try:
+        for shard in range(info["shards"]):
+            path = os.path.join(info["result_dir"], f"shard-{shard:05d}.jsonl")
+            with open(path, encoding="utf-8") as f:
+                shard_rows = [json.loads(line) for line in f if line.strip()]
+            # Shard rows are numbered from 0; renumber across the whole input
+            for row in shard_rows:
+                row["row"] += rows
+            writer.write(shard_rows)
+            rows += len(shard_rows)
+        writer.flush()
+    finally:
+        writer.close()
+    os.replace(tmp_path, output_path)
+    queue.mark_merged(job)
+    # Also drops attempt files left behind by workers that died mid-shard
+    shutil.rmtree(info["result_dir"], ignore_errors=True)
+    return rows
+
+
+def run_coordinator(queue, input_path, output_path, shard_bytes, poll_seconds=5.0, log=sys.stderr):
+    job, count = publish_file(queue, input_path, output_path, shard_bytes)
+    print(f"Published {job}: {count} shards", file=log)
+    started = time.time()
+    while True:
+        status = queue.status(job)
+        print(f"{status['done']}/{status['shards']} shards done, {status['leased']} leased, "
+              f"{status['failed']} failed, {status['retries']} retries", file=log)
+        if status["done"] + status["failed"] == status["shards"]:
+            break
+        time.sleep(poll_seconds)
+    if status["failed"]:
+        details = "; ".join(f"shard {shard}: {error}" for shard, error in sorted(queue.failures(job).items()))
+        raise RuntimeError(f"{job}: {status['failed']} shards failed after {queue.max_attempts} attempts ({details})")
+    rows = merge(queue, job)
+    print(f"Done: {rows} rows in {time.time() - started:.1f}s -> {output_path}", file=log)
+    return job
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m distributed")
+    parser.add_argument("--queue", default=QUEUE_PATH, help="SQLite work queue file")
+    parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS,
+                        help="Claims per shard before it is marked failed")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinator", help="Shard a file, wait for workers, merge")
+    coordinator.add_argument("input", help="JSONL or CSV with text, screen and sleep fields")
+    coordinator.add_argument("output", help="Results file (.jsonl or .csv)")
+    coordinator.add_argument("--shard-mb", type=float, default=64)
+
+    worker = commands.add_parser("worker", help="Score shards from the queue")
+    worker.add_argument("--batch-size", type=int, default=32)
+    worker.add_argument("--lease", type=float, default=60.0, help="Lease length in seconds")
+    worker.add_argument("--forever", action="store_true", help="Keep polling when the queue is empty")
+
+    args = parser.parse_args(argv)
+    queue = SQLiteWorkQueue(args.queue, args.max_attempts)
+    if args.command == "coordinator":
+        run_coordinator(queue, args.input, args.output, int(args.shard_mb * 1024 * 1024))
+    elif args.command == "worker":
+        from model import get_predictor
+        run_worker(queue, get_predictor, args.batch_size, args.lease, idle_exit=not args.forever)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Reduced-depth BERT: embeddings, the first k encoder layers, then the pooler
+
+The emotional score only uses abs(mean(pooler_output)), so a shallower
+encoder can approximate it. Each depth gets a linear calibration fitted
+against the full 12-layer score on sample texts, stored in
+data/early_exit.json together with its measured latency and fidelity.
+
+Calibrate and print the latency-vs-fidelity table:
+    python -m early_exit calibrate
+Then run the app or API with BURNOUT_EARLY_EXIT_LAYERS=<k>.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+import numpy as np
+import torch
+
+CALIBRATION_PATH = "data/early_exit.json"
+# Texts per forward pass, and how many texts a calibration uses at most
+BATCH_SIZE = 32
+MAX_TEXTS = 1000
+
+SAMPLE_TEXTS = [
+    "Feeling rested and calm, had a good weekend with family.",
+    "Deadlines are approaching and I'm falling behind, completely overwhelmed.",
+    "I can't sleep, I'm exhausted and anxious about work every single day.",
+    "Normal week, some meetings, nothing special to report.",
+    "I feel empty and drained, nothing I do seems to matter anymore.",
+    "Busy but productive, looking forward to my holiday next month.",
+    "My manager keeps adding tasks and I have no time left for myself.",
+    "Work is fine, although the commute is long and tiring.",
+]
+
+
+def load_calibration(path=CALIBRATION_PATH):
+    """{layers: {"slope", "intercept", ...}} saved by calibrate()"""
+    if os.path.exists(path):
+        with open(path) as f:
+            return {int(layers): entry for layers, entry in json.load(f).items()}
+    return {}
+
+
+class EarlyExitEncoder:
+    """Runs only the first `layers` encoder layers of a BertModel
+
+    The truncated emotional score is mapped back to the full-depth scale
+    with slope * raw + intercept. Without a saved calibration the raw
+    score is used as is.
+    """
+
+    def __init__(self, tokenizer, model, layers, calibration=None, max_length=128):
+        total = len(model.encoder.layer)
+        if not 1 <= layers <= total:
+            raise ValueError(f"layers must be between 1 and {total}, got {layers}")
+        self.tokenizer = tokenizer
+        self.model = model
+        self.layers = layers
+        self.max_length = max_length
+        entry = (calibration if calibration is not None else load_calibration()).get(layers, {})
+        self.slope = entry.get("slope", 1.0)
+        self.intercept = entry.get("intercept", 0.0)
+
+    def pooled(self, texts):
+        """Pooler output after `layers` encoder layers, one row per text"""
+        inputs = self.tokenizer(
+            list(texts),
+            return_tensors="pt",
+            truncation=True,
+            padding=True,
+            max_length=self.max_length
+        )
+        with torch.no_grad():
+            hidden = self.model.embeddings(
+                input_ids=inputs["input_ids"],
+                token_type_ids=inputs["token_type_ids"]
+            )
+            mask = self.model.get_extended_attention_mask(inputs["attention_mask"], inputs["input_ids"].shape)
+            for layer in self.model.encoder.layer[:self.layers]:
+                output = layer(hidden, attention_mask=mask)
+                hidden = output[0] if isinstance(output, tuple) else output
+            return self.model.pooler(hidden).numpy()
+
+    def raw_scores(self, texts):
+        return np.clip(np.abs(self.pooled(texts).mean(axis=1)), 0, 1)
+
+    def calibrated(self, raw):
+        return np.clip(self.slope * np.asarray(raw) + self.intercept, 0, 1)
+
+    def emotional_scores(self, texts):
+        """Calibrated emotional score per text, on the full-depth scale"""
+        return self.calibrated(self.raw_scores(texts))
+
+    def analyze(self, text):
+        """(emotional_score, text_vector) like BurnoutPredictor.analyze_sentiment"""
+        text_vector = self.pooled([text])[0]
+        raw = min(max(abs(np.mean(text_vector)), 0), 1)
+        return float(self.calibrated(raw)), text_vector
+
+
+def _batched(fn, texts, batch_size):
+    """fn over fixed-size chunks of texts, so no forward pass grows with the input"""
+    return np.concatenate([fn(texts[start:start + batch_size]) for start in range(0, len(texts), batch_size)])
+
+
+def _median_ms(fn, texts, repeats):
+    fn(texts[0])
+    timings = []
+    for _ in range(repeats):
+        for text in texts:
+            start = time.perf_counter()
+            fn(text)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(predictor, texts, depths=None, repeats=3, path=CALIBRATION_PATH,
+              batch_size=BATCH_SIZE, max_texts=MAX_TEXTS, seed=0):
+    """Fit every depth on half the texts, score fidelity on the other half
+
+    Returns one row per depth with its latency, the mean and max absolute
+    error of the calibrated emotional score and the share of held-out texts
+    whose risk moves by less than one point, and saves the fits to path.
+    At most max_texts distinct texts are used (a seeded sample), scored
+    batch_size at a time.
+    """
+    texts = list(dict.fromkeys(text for text in texts if text and text.strip()))
+    if len(texts) < 4:
+        raise ValueError("Calibration needs at least 4 distinct texts")
+    if len(texts) > max_texts:
+        keep = np.random.default_rng(seed).choice(len(texts), size=max_texts, replace=False)
+        texts = [texts[i] for i in sorted(keep)]
+    fit_texts, held_out = texts[::2], texts[1::2]
+    total = len(predictor.model.encoder.layer)
+    depths = depths or range(1, total + 1)
+
+    full_fit = _batched(predictor.emotional_scores, fit_texts, batch_size)
+    full_held = _batched(predictor.emotional_scores, held_out, batch_size)
+    # Latency is per single text, so it only needs a few of them
+    timed = held_out[:50]
+    full_ms = _median_ms(lambda text: predictor.emotional_scores([text]), timed, repeats)
+
+    table, calibration = [], {}
+    for layers in depths:
+        encoder = EarlyExitEncoder(predictor.tokenizer, predictor.model, layers, calibration={})
+        raw = _batched(encoder.raw_scores, fit_texts, batch_size)
+        if np.ptp(raw) > 0:
+            encoder.slope, encoder.intercept = (float(v) for v in np.polyfit(raw, full_fit, 1))
+        else:
+            encoder.slope, encoder.intercept = 0.0, float(full_fit.mean())
+
+        errors = np.abs(_batched(encoder.emotional_scores, held_out, batch_size) - full_held)
+        latency_ms = _median_ms(lambda text: encoder.raw_scores([text]), timed, repeats)
+        row = {
+            "layers": layers,
+            "latency_ms": round(latency_ms, 2),
+            "speedup": round(full_ms / latency_ms, 2),
+            "mae": round(float(errors.mean()), 5),
+            "max_error": round(float(errors.max()), 5),
+            # Emotional score has weight 0.45, so 1 risk point is 1/45 of it
+            "within_1_point": round(float((errors * 45 < 1).mean()), 3),
+        }
+        table.append(row)
+        calibration[layers] = {"slope": encoder.slope, "intercept": encoder.intercept, **row}
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({str(layers): entry for layers, entry in calibration.items()}, f, indent=2)
+    os.replace(tmp_path, path)
+    return full_ms, table
+
+
+def calibration_texts(history_path="data/history.csv", store=None):
+    """Sample texts plus every stored history text (full texts when available)"""
+    import csv
+    from textstore import TextStore
+
+    texts = list(SAMPLE_TEXTS)
+    store = store or TextStore()
+    if os.path.exists(history_path):
+        with open(history_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                digest = row.get("text_hash")
+                texts.append(store.get(digest) if digest in store else row.get("text_preview", ""))
+    return texts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m early_exit")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("calibrate", help="Fit every depth and print latency vs fidelity")
+    run.add_argument("--history", default="data/history.csv")
+    run.add_argument("--repeats", type=int, default=3)
+    run.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    run.add_argument("--max-texts", type=int, default=MAX_TEXTS)
+    args = parser.parse_args(argv)
+
+    if args.command == "calibrate":
+        from model import BurnoutPredictor
+
+        texts = calibration_texts(args.history)
+        full_ms, table = calibrate(BurnoutPredictor(), texts, repeats=args.repeats,
+                                   batch_size=args.batch_size, max_texts=args.max_texts)
+        print(f"{min(len(set(texts)), args.max_texts)} texts, full depth {full_ms:.1f} ms/text")
+        print(f"{'layers':>6} {'ms':>8} {'speedup':>8} {'MAE':>9} {'max err':>9} {'<1 pt':>7}")
+        for row in table:
+            print(f"{row['layers']:>6} {row['latency_ms']:>8.1f} {row['speedup']:>7.2f}x "
+                  f"{row['mae']:>9.5f} {row['max_error']:>9.5f} {row['within_1_point'] * 100:>6.1f}%")
+        print(f"✅ Calibration saved to {CALIBRATION_PATH}")
+
+
+if __name__ == "__main__":
+    main()
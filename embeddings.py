@@ -0,0 +1,260 @@
+import os
+import threading
+import numpy as np
+
+EMBEDDING_DIM = 768
+EMBEDDINGS_PATH = "data/embeddings.f16"
+
+
+class EmbeddingStore:
+    """Append-only float16 matrix of check-in embeddings, row i = history row i"""
+
+    def __init__(self, path=EMBEDDINGS_PATH, dim=EMBEDDING_DIM):
+        self.path = path
+        self.dim = dim
+        self.row_bytes = dim * np.dtype(np.float16).itemsize
+
+    def __len__(self):
+        if not os.path.exists(self.path):
+            return 0
+        # A torn last row (crash mid-write) is ignored until the next append
+        return os.path.getsize(self.path) // self.row_bytes
+
+    def append(self, vector, row=None):
+        """Append one vector, zero-padding any history rows that have none"""
+        vector = np.asarray(vector, dtype=np.float16).reshape(self.dim)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        with open(self.path, "ab") as f:
+            count = f.tell() // self.row_bytes
+            f.truncate(count * self.row_bytes)
+
+            if row is None:
+                row = count
+            elif row < count:
+                raise ValueError(f"Embedding row {row} is already stored")
+
+            # Rows saved without a vector (e.g. fallback predictor) stay zero
+            if row > count:
+                f.write(np.zeros((row - count, self.dim), dtype=np.float16).tobytes())
+            f.write(vector.tobytes())
+
+        return row
+
+    def matrix(self):
+        """Read-only memory map of all stored vectors"""
+        rows = len(self)
+        if rows == 0:
+            return np.zeros((0, self.dim), dtype=np.float16)
+        return np.memmap(self.path, dtype=np.float16, mode="r", shape=(rows, self.dim))
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    # Zero rows (padding) keep a zero vector and never rank as similar
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _top_k(scores, ids, k):
+    if len(scores) > k:
+        keep = np.argpartition(-scores, k)[:k]
+        scores, ids = scores[keep], ids[keep]
+    order = np.argsort(-scores, kind="stable")
+    return scores[order], ids[order]
+
+
+class VectorIndex:
+    """Cosine-similarity search over an EmbeddingStore
+
+    Small stores are scanned exactly in blocks. Past `exact_limit` rows an
+    IVF index is used: rows are clustered around spherical k-means
+    centroids, stored as int8 codes per list, and the best candidates from
+    the probed lists are re-ranked against the float16 matrix.
+
+    Training runs on a background thread; until it finishes, searches keep
+    using the exact scan or the previous index. Inverse row norms are
+    cached, so no search renormalizes the matrix. One index is shared by
+    every session, so refresh and search hold a lock.
+    """
+
+    def __init__(self, store=None, exact_limit=20000, block_rows=8192, n_probe=8, seed=0,
+                 background_training=True):
+        self.store = store or EmbeddingStore()
+        self.exact_limit = exact_limit
+        self.block_rows = block_rows
+        self.n_probe = n_probe
+        self.seed = seed
+        self.background_training = background_training
+
+        self.size = 0
+        self.trained_size = 0
+        self.centroids = None
+        self.lists = []
+        self.inv_norms = np.zeros(0, dtype=np.float32)
+        self._training = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Pick up rows appended since the last call"""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        matrix = self.store.matrix()
+        rows = len(matrix)
+        self._extend_norms(matrix, rows)
+
+        if rows <= self.exact_limit:
+            self.centroids = None
+            self.lists = []
+        else:
+            if self._training is None and (self.centroids is None or rows >= 2 * self.trained_size):
+                if self.background_training:
+                    self._training = threading.Thread(target=self._train, args=(matrix, rows),
+                                                      name="ivf-training", daemon=True)
+                    self._training.start()
+                else:
+                    self._install(*self._build(matrix, rows), rows)
+            if self.centroids is not None and rows > self.size:
+                _add(self.lists, self.centroids, matrix, self.size, rows, self.block_rows)
+
+        self.size = rows
+        return matrix
+
+    def _extend_norms(self, matrix, rows):
+        known = len(self.inv_norms)
+        if rows <= known:
+            return
+        parts = [self.inv_norms]
+        for start in range(known, rows, self.block_rows):
+            block = np.asarray(matrix[start:min(start + self.block_rows, rows)], dtype=np.float32)
+            norms = np.linalg.norm(block, axis=1)
+            # Zero rows (padding) keep a zero weight and never rank as similar
+            parts.append(np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0))
+        self.inv_norms = np.concatenate(parts)
+
+    def wait_for_training(self, timeout=None):
+        """Block until a background training run (if any) has been installed"""
+        thread = self._training
+        if thread is not None:
+            thread.join(timeout)
+
+    def _train(self, matrix, rows):
+        try:
+            centroids, lists = self._build(matrix, rows)
+        except Exception:
+            with self._lock:
+                self._training = None
+            raise
+        with self._lock:
+            self._install(centroids, lists, rows)
+            self._training = None
+
+    def _install(self, centroids, lists, rows):
+        # Rows appended while training are added by the next refresh
+        self.centroids = centroids
+        self.lists = lists
+        self.trained_size = rows
+        self.size = rows
+
+    def _build(self, matrix, rows):
+        """Centroids and filled lists for the first `rows` rows; touches no shared state"""
+        n_lists = int(4 * np.sqrt(rows))
+        rng = np.random.default_rng(self.seed)
+        sample_ids = np.sort(rng.choice(rows, size=min(rows, 64 * n_lists), replace=False))
+        sample = _normalize(matrix[sample_ids])
+
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(10):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            empty = ~sums.any(axis=1)
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+
+        lists = [
+            (np.zeros(0, dtype=np.int64), np.zeros((0, self.store.dim), dtype=np.int8), np.zeros(0, dtype=np.float32))
+            for _ in range(n_lists)
+        ]
+        _add(lists, centroids, matrix, 0, rows, self.block_rows)
+        return centroids, lists
+
+    def search(self, vector, k=5, exclude=None):
+        """Return up to k (row, similarity) pairs, most similar first"""
+        query = _normalize(vector).reshape(-1)
+        with self._lock:
+            matrix = self._refresh()
+            if len(matrix) == 0 or not query.any():
+                return []
+
+            if self.centroids is None:
+                scores, ids = self._search_exact(matrix, query, k + 1)
+            else:
+                scores, ids = self._search_ivf(matrix, query, k + 1)
+
+        results = [
+            (int(row), float(score))
+            for score, row in zip(scores, ids)
+            if row != exclude and score > 0
+        ]
+        return results[:k]
+
+    def _search_exact(self, matrix, query, k):
+        best_scores = np.zeros(0, dtype=np.float32)
+        best_ids = np.zeros(0, dtype=np.int64)
+        query = query.astype(np.float32)
+
+        for start in range(0, len(matrix), self.block_rows):
+            stop = min(start + self.block_rows, len(matrix))
+            # float32 goes through BLAS; float16 matmul does not
+            block = np.asarray(matrix[start:stop], dtype=np.float32)
+            block_scores = (block @ query) * self.inv_norms[start:stop]
+            scores = np.concatenate([best_scores, block_scores])
+            ids = np.concatenate([best_ids, np.arange(start, stop)])
+            best_scores, best_ids = _top_k(scores, ids, k)
+
+        return best_scores, best_ids
+
+    def _search_ivf(self, matrix, query, k):
+        probes = np.argsort(-(self.centroids @ query))[:self.n_probe]
+        candidates = []
+        approx = []
+
+        for list_id in probes:
+            ids, codes, scales = self.lists[list_id]
+            if len(ids):
+                candidates.append(ids)
+                approx.append((codes.astype(np.float32) @ query) * scales)
+
+        if not candidates:
+            return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64)
+
+        # Re-rank a shortlist from the quantized codes with the real vectors
+        _, shortlist = _top_k(np.concatenate(approx), np.concatenate(candidates), 8 * k)
+        shortlist = np.sort(shortlist)
+        exact = (np.asarray(matrix[shortlist], dtype=np.float32) @ query) * self.inv_norms[shortlist]
+        return _top_k(exact, shortlist, k)
+
+
+def _add(lists, centroids, matrix, start, stop, block_rows):
+    """Quantize rows start..stop into the IVF lists of their nearest centroid"""
+    for block_start in range(start, stop, block_rows):
+        block_stop = min(block_start + block_rows, stop)
+        block = _normalize(matrix[block_start:block_stop])
+        assign = np.argmax(block @ centroids.T, axis=1)
+
+        # Symmetric int8 quantization with one scale per row
+        scales = np.abs(block).max(axis=1) / 127
+        codes = np.round(block / np.where(scales > 0, scales, 1)[:, None]).astype(np.int8)
+        ids = np.arange(block_start, block_stop)
+
+        for list_id in np.unique(assign):
+            mask = assign == list_id
+            old_ids, old_codes, old_scales = lists[list_id]
+            lists[list_id] = (
+                np.concatenate([old_ids, ids[mask]]),
+                np.concatenate([old_codes, codes[mask]]),
+                np.concatenate([old_scales, scales[mask]]),
+            )
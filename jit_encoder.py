@@ -0,0 +1,82 @@
+import torch
+
+DEFAULT_BUCKETS = (16, 32, 64, 128)
+
+
+class _PoolerModule(torch.nn.Module):
+    """BertModel wrapper returning only the pooler output, for tracing"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        outputs = self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            token_type_ids=token_type_ids,
+            return_dict=False
+        )
+        return outputs[1]
+
+
+class BucketedEncoder:
+    """TorchScript-traced BERT encoder for a fixed set of sequence lengths
+
+    Each input is padded up to the smallest bucket that fits it, so only
+    len(buckets) graphs ever exist. Graphs are traced in memory at load and
+    warmed up so the first real request is not the one paying for graph
+    optimization. They are not frozen or saved, so every bucket runs on the
+    model's own parameters: one copy of the weights, whichever were loaded.
+    Single texts only; batches stay eager.
+    """
+
+    def __init__(self, tokenizer, model, buckets=DEFAULT_BUCKETS, max_length=128):
+        self.tokenizer = tokenizer
+        self.buckets = sorted(b for b in buckets if b <= max_length)
+        self.max_length = max_length
+
+        model.eval()
+        module = _PoolerModule(model)
+        self.graphs = {length: self._trace(module, length) for length in self.buckets}
+        self.warm_up()
+
+    def _example_inputs(self, length):
+        input_ids = torch.full((1, length), self.tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.ones((1, length), dtype=torch.long)
+        token_type_ids = torch.zeros((1, length), dtype=torch.long)
+        return input_ids, attention_mask, token_type_ids
+
+    def _trace(self, module, length):
+        with torch.no_grad():
+            return torch.jit.trace(module, self._example_inputs(length), strict=False).eval()
+
+    def warm_up(self, runs=2):
+        """Run every bucket so the profiling executor has optimized it"""
+        with torch.no_grad():
+            for length, graph in self.graphs.items():
+                for _ in range(runs):
+                    graph(*self._example_inputs(length))
+
+    def bucket_for(self, length):
+        for bucket in self.buckets:
+            if bucket >= length:
+                return bucket
+        return None
+
+    def encode(self, text):
+        """Pooler vector for one text, or None if it is longer than every bucket"""
+        encoded = self.tokenizer(text, truncation=True, max_length=self.max_length)
+        bucket = self.bucket_for(len(encoded["input_ids"]))
+        if bucket is None:
+            return None
+
+        inputs = self.tokenizer(text, truncation=True, padding="max_length", max_length=bucket,
+                                return_tensors="pt")
+        with torch.no_grad():
+            pooled = self.graphs[bucket](
+                inputs["input_ids"],
+                inputs["attention_mask"],
+                inputs["token_type_ids"]
+            )
+        return pooled.numpy()[0]
@@ -0,0 +1,159 @@
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Opt-in: snapshots are expensive, so nothing is traced unless this is set
+ENABLED = os.environ.get("BURNOUT_MEMPROFILE", "0") == "1"
+DUMP_PATH = "data/memprofile.json"
+
+
+def rss_bytes():
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # Not Linux: fall back to peak RSS (KiB on Linux, bytes on macOS)
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _nbytes(value):
+    if hasattr(value, "memory_usage"):
+        return int(value.memory_usage(deep=True).sum())
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+class MemoryProfiler:
+    """tracemalloc snapshots around code paths plus per-component sizes
+
+    track(name) records, per named section, the RSS delta and the Python
+    allocation delta (with the top allocating lines) of the latest call and
+    the running totals. components() attributes resident memory to the
+    model weights, history frames and session state, and counts() the
+    open matplotlib figures, so leaks show up as a number that only ever
+    grows.
+
+    Snapshots and RSS are process-wide, so a section's deltas include
+    whatever other threads allocated meanwhile. They are exact only when
+    the tracked code is the only thing running; a call that overlapped
+    another tracked section is marked "overlapped" so its numbers are
+    read with that in mind.
+    """
+
+    def __init__(self, enabled=ENABLED, top=10, frames=10):
+        self.enabled = enabled
+        self.top = top
+        self.frames = frames
+        self.sections = {}
+        self._running = []      # one flag dict per track() call in progress
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        call = {"overlapped": False}
+        with self._lock:
+            self._running.append(call)
+            if len(self._running) > 1:
+                for running in self._running:
+                    running["overlapped"] = True
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        before = tracemalloc.take_snapshot()
+        rss_before = rss_bytes()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            after = tracemalloc.take_snapshot()
+            rss_delta = rss_bytes() - rss_before
+            # Leave out the profiler's own bookkeeping
+            exclude = [tracemalloc.Filter(False, tracemalloc.__file__)]
+            diff = after.filter_traces(exclude).compare_to(before.filter_traces(exclude), "lineno")
+
+            with self._lock:
+                self._running.remove(call)
+                section = self.sections.setdefault(name, {
+                    "calls": 0, "overlapped_calls": 0, "rss_delta_total": 0, "alloc_delta_total": 0,
+                })
+                alloc_delta = sum(stat.size_diff for stat in diff)
+                section["calls"] += 1
+                section["overlapped_calls"] += call["overlapped"]
+                section["rss_delta_total"] += rss_delta
+                section["alloc_delta_total"] += alloc_delta
+                section["last"] = {
+                    "seconds": round(elapsed, 4),
+                    "overlapped": call["overlapped"],
+                    "rss_delta": rss_delta,
+                    "alloc_delta": alloc_delta,
+                    "top_allocations": [
+                        {"where": str(stat.traceback[0]), "size_diff": stat.size_diff,
+                         "count_diff": stat.count_diff}
+                        for stat in diff[:self.top]
+                    ],
+                }
+
+    def components(self, history_df=None, session_state=None):
+        """Bytes attributed to each major component of the server process"""
+        sizes = {"process_rss": rss_bytes()}
+
+        model = sys.modules.get("model")
+        predictor = getattr(model, "_predictor", None)
+        if predictor is not None:
+            tensors = list(predictor.model.parameters()) + list(predictor.model.buffers())
+            sizes["model_weights"] = sum(t.numel() * t.element_size() for t in tensors)
+
+        if history_df is not None:
+            sizes["history_frames"] = _nbytes(history_df)
+
+        if session_state is not None:
+            sizes["session_state"] = sum(_nbytes(session_state[key]) for key in list(session_state.keys()))
+
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            sizes["traced_current"] = current
+            sizes["traced_peak"] = peak
+        return sizes
+
+    def counts(self):
+        """Object counts that are not byte sizes"""
+        counts = {}
+        pyplot = sys.modules.get("matplotlib.pyplot")
+        if pyplot is not None:
+            counts["open_figures"] = len(pyplot.get_fignums())
+        return counts
+
+    def report(self, **components):
+        with self._lock:
+            sections = json.loads(json.dumps(self.sections))
+        return {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "pid": os.getpid(),
+            "components": self.components(**components),
+            "counts": self.counts(),
+            "sections": sections,
+        }
+
+    def dump(self, path=DUMP_PATH, **components):
+        """Write report() as JSON and return the path"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(**components), f, indent=2)
+        return path
+
+
+# Shared profiler for the server process
+profiler = MemoryProfiler()
@@ -1,30 +1,63 @@
+import os
+import threading
 import torch
 import numpy as np
 from transformers import BertTokenizer, BertModel
 import warnings
 warnings.filterwarnings('ignore')
 
+# Slider ranges on the Prediction page, used for what-if sweeps
+SCREEN_GRID = np.arange(0, 16.5, 0.5)
+SLEEP_GRID = np.arange(0, 12.5, 0.5)
+
 class BurnoutPredictor:
-    def __init__(self):
-        self.tokenizer = BertTokenizer.from_pretrained("bert-base-uncased")
-        self.model = BertModel.from_pretrained("bert-base-uncased")
+    def __init__(self, compiled=False, buckets=None, weights_bundle=None, early_exit_layers=None):
+        if weights_bundle:
+            # Read-only memory-mapped weights shared with other replicas
+            from weights import load_bundle
+            self.tokenizer, self.model = load_bundle(weights_bundle)
+        else:
+            self.tokenizer = BertTokenizer.from_pretrained("bert-base-uncased")
+            self.model = BertModel.from_pretrained("bert-base-uncased")
         print("✅ BERT model loaded successfully")
+        
+        # Optional TorchScript graphs per sequence-length bucket
+        self.encoder = None
+        if compiled:
+            from jit_encoder import BucketedEncoder, DEFAULT_BUCKETS
+            self.encoder = BucketedEncoder(self.tokenizer, self.model, buckets or DEFAULT_BUCKETS)
+            print(f"✅ Compiled encoder ready for lengths {self.encoder.buckets}")
+        
+        # Optional reduced-depth encoder, calibrated to the full-depth score
+        self.early_exit = None
+        if early_exit_layers:
+            from early_exit import EarlyExitEncoder
+            self.early_exit = EarlyExitEncoder(self.tokenizer, self.model, early_exit_layers)
+            print(f"✅ Early-exit encoder using {early_exit_layers} layers")
     
     def analyze_sentiment(self, text):
         """Extract emotional score from text"""
-        inputs = self.tokenizer(
-            text,
-            return_tensors="pt",
-            truncation=True,
-            padding=True,
-            max_length=128
-        )
+        if self.early_exit is not None:
+            return self.early_exit.analyze(text)
         
-        with torch.no_grad():
-            outputs = self.model(**inputs)
+        text_vector = None
+        if self.encoder is not None:
+            text_vector = self.encoder.encode(text)
         
-        # Get CLS token embedding
-        text_vector = outputs.pooler_output.numpy()[0]
+        if text_vector is None:
+            inputs = self.tokenizer(
+                text,
+                return_tensors="pt",
+                truncation=True,
+                padding=True,
+                max_length=128
+            )
+            
+            with torch.no_grad():
+                outputs = self.model(**inputs)
+            
+            # Get CLS token embedding
+            text_vector = outputs.pooler_output.numpy()[0]
         
         # Calculate emotional intensity (absolute mean)
         emotional_score = abs(np.mean(text_vector))
@@ -62,10 +95,10 @@ class BurnoutPredictor:
         else:
             return 0.9
     
-    def predict(self, text, screen_hours, sleep_hours):
+    def predict(self, text, screen_hours, sleep_hours, return_vector=False):
         """Main prediction function"""
         # Get emotional score
-        emotional_score, _ = self.analyze_sentiment(text)
+        emotional_score, text_vector = self.analyze_sentiment(text)
         
         # Calculate factors
         screen_factor = self.calculate_screen_factor(screen_hours)
@@ -81,11 +114,111 @@ class BurnoutPredictor:
         # Convert to percentage
         risk_percentage = min(max(risk_score, 0), 1) * 100
         
+        if return_vector:
+            return round(risk_percentage, 2), round(emotional_score, 4), text_vector
         return round(risk_percentage, 2), round(emotional_score, 4)
 
-# Global predictor instance
-predictor = BurnoutPredictor()
+    def predict_batch(self, texts, screen_hours, sleep_hours):
+        """Score many inputs with one padded BERT forward pass"""
+        return self.score_rows(self.emotional_scores(texts), screen_hours, sleep_hours)
+
+    def emotional_scores(self, texts):
+        """Emotional intensity of many texts from one padded forward pass"""
+        if self.early_exit is not None:
+            return self.early_exit.emotional_scores(texts)
+
+        inputs = self.tokenizer(
+            list(texts),
+            return_tensors="pt",
+            truncation=True,
+            padding=True,
+            max_length=128
+        )
+
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+
+        # Same emotional intensity as analyze_sentiment, one row per text
+        text_vectors = outputs.pooler_output.numpy()
+        return np.clip(np.abs(text_vectors.mean(axis=1)), 0, 1)
+
+    def score_rows(self, emotional_scores, screen_hours, sleep_hours):
+        """(score, emotional_score) per row from precomputed emotional scores"""
+        emotional_scores = np.asarray(emotional_scores, dtype=float)
+        risk_scores = (
+            0.45 * emotional_scores +
+            0.35 * self.screen_factors(screen_hours) +
+            0.20 * self.sleep_factors(sleep_hours)
+        )
+        risk_percentages = np.clip(risk_scores, 0, 1) * 100
+
+        return [
+            (round(float(risk), 2), round(float(emotional), 4))
+            for risk, emotional in zip(risk_percentages, emotional_scores)
+        ]
+
+    def screen_factors(self, screen_hours):
+        """Vectorized calculate_screen_factor over an array of hours"""
+        screen_hours = np.asarray(screen_hours, dtype=float)
+        return np.select(
+            [screen_hours <= 4, screen_hours <= 6, screen_hours <= 8, screen_hours <= 10],
+            [0.2, 0.4, 0.6, 0.8],
+            1.0
+        )
+
+    def sleep_factors(self, sleep_hours):
+        """Vectorized calculate_sleep_factor over an array of hours"""
+        sleep_hours = np.asarray(sleep_hours, dtype=float)
+        return np.select(
+            [sleep_hours >= 8, sleep_hours >= 7, sleep_hours >= 6, sleep_hours >= 5],
+            [0.1, 0.3, 0.5, 0.7],
+            0.9
+        )
 
-def predict_burnout(text, screen, sleep):
+    def what_if(self, text, screen_grid=SCREEN_GRID, sleep_grid=SLEEP_GRID):
+        """Risk surface over screen x sleep hours from a single text encoding
+
+        Returns (risk, emotional_score) where risk[i, j] is the burnout
+        percentage for screen_grid[i] and sleep_grid[j], rounded like predict.
+        """
+        emotional_score, _ = self.analyze_sentiment(text)
+
+        risk_scores = (
+            0.45 * emotional_score +
+            0.35 * self.screen_factors(screen_grid)[:, None] +
+            0.20 * self.sleep_factors(sleep_grid)[None, :]
+        )
+        risk = np.round(np.clip(risk_scores, 0, 1) * 100, 2)
+
+        return risk, round(float(emotional_score), 4)
+
+# Global predictor instance, loaded on first use so importing is cheap
+_predictor = None
+_predictor_lock = threading.Lock()
+
+def get_predictor():
+    """Return the shared BurnoutPredictor, loading BERT on first call"""
+    global _predictor
+    with _predictor_lock:
+        if _predictor is None:
+            # BURNOUT_COMPILED_ENCODER=1 enables the TorchScript bucket path,
+            # BURNOUT_WEIGHTS_BUNDLE=<dir> loads memory-mapped weights,
+            # BURNOUT_EARLY_EXIT_LAYERS=<k> runs only the first k layers
+            compiled = os.environ.get("BURNOUT_COMPILED_ENCODER", "0") == "1"
+            weights_bundle = os.environ.get("BURNOUT_WEIGHTS_BUNDLE") or None
+            early_exit_layers = int(os.environ.get("BURNOUT_EARLY_EXIT_LAYERS", "0")) or None
+            _predictor = BurnoutPredictor(compiled=compiled, weights_bundle=weights_bundle,
+                                          early_exit_layers=early_exit_layers)
+    return _predictor
+
+def predict_burnout(text, screen, sleep, return_vector=False):
     """Wrapper function for Streamlit"""
-    return predictor.predict(text, screen, sleep)
\ No newline at end of file
+    return get_predictor().predict(text, screen, sleep, return_vector=return_vector)
+
+def what_if_burnout(text, screen_grid=SCREEN_GRID, sleep_grid=SLEEP_GRID):
+    """Wrapper for the what-if risk surface"""
+    return get_predictor().what_if(text, screen_grid, sleep_grid)
+
+if __name__ == "__main__":
+    from bulk import main
+    main(get_predictor)
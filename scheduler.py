@@ -0,0 +1,203 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)   # highest first
+
+DEFAULT_MAX_QUEUE = {INTERACTIVE: 64, BATCH: 16}
+DEFAULT_DEADLINE = {INTERACTIVE: 5.0, BATCH: 60.0}   # seconds
+
+
+class Busy(Exception):
+    """Request rejected or shed because the predictor is overloaded"""
+
+
+class _Ticket:
+    __slots__ = ("future", "fn", "args", "priority", "enqueued", "deadline")
+
+    def __init__(self, fn, args, priority, deadline):
+        self.future = Future()
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.enqueued = time.monotonic()
+        self.deadline = deadline
+
+
+class InferenceScheduler:
+    """Bounded priority queues and worker threads in front of the predictor
+
+    Interactive requests are always dequeued before batch work. A request
+    is refused up front when its queue is full or when the estimated wait
+    (work queued ahead of it x mean service time) already overshoots its
+    deadline, and it is shed without running if its deadline passes while
+    queued. Both cases raise Busy so callers can answer "busy" quickly
+    instead of letting latency grow without bound.
+    """
+
+    def __init__(self, workers=1, max_queue=None, deadlines=None, wait_samples=1000):
+        self.max_queue = dict(DEFAULT_MAX_QUEUE, **(max_queue or {}))
+        self.deadlines = dict(DEFAULT_DEADLINE, **(deadlines or {}))
+        self.workers = workers
+
+        self._cond = threading.Condition()
+        self._queues = {priority: deque() for priority in PRIORITIES}
+        self._running = 0
+        self._closed = False
+
+        # Metrics
+        self._service_time = None    # EWMA of seconds per request
+        self._waits = {priority: deque(maxlen=wait_samples) for priority in PRIORITIES}
+        self._counts = {
+            priority: {"submitted": 0, "completed": 0, "failed": 0, "rejected": 0, "shed": 0, "cancelled": 0}
+            for priority in PRIORITIES
+        }
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"inference-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _estimated_wait(self, priority):
+        if self._service_time is None:
+            return 0.0
+        ahead = self._running
+        for p in PRIORITIES:
+            ahead += len(self._queues[p])
+            if p == priority:
+                break
+        return ahead * self._service_time / self.workers
+
+    def submit(self, fn, *args, priority=INTERACTIVE, deadline=None):
+        """Queue fn(*args) and return a Future; raises Busy if refused"""
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority {priority!r}")
+        timeout = self.deadlines[priority] if deadline is None else deadline
+        ticket = _Ticket(fn, args, priority, time.monotonic() + timeout)
+
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Scheduler is shut down")
+            counts = self._counts[priority]
+            counts["submitted"] += 1
+
+            if len(self._queues[priority]) >= self.max_queue[priority]:
+                counts["rejected"] += 1
+                raise Busy(f"{priority} queue is full")
+            if self._estimated_wait(priority) > timeout:
+                counts["rejected"] += 1
+                raise Busy(f"Estimated wait exceeds the {timeout:.2f}s deadline")
+
+            self._queues[priority].append(ticket)
+            self._cond.notify()
+        return ticket.future
+
+    def run(self, fn, *args, priority=INTERACTIVE, deadline=None):
+        """submit() and wait for the result"""
+        return self.submit(fn, *args, priority=priority, deadline=deadline).result()
+
+    def _next_ticket(self):
+        with self._cond:
+            while True:
+                for priority in PRIORITIES:
+                    if self._queues[priority]:
+                        self._running += 1
+                        return self._queues[priority].popleft()
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def _worker(self):
+        while True:
+            ticket = self._next_ticket()
+            if ticket is None:
+                return
+
+            started = time.monotonic()
+            counts = self._counts[ticket.priority]
+            try:
+                if not ticket.future.set_running_or_notify_cancel():
+                    # Cancelled through the Future itself rather than cancel()
+                    with self._cond:
+                        counts["cancelled"] += 1
+                    continue
+                if started > ticket.deadline:
+                    with self._cond:
+                        counts["shed"] += 1
+                    ticket.future.set_exception(Busy("Deadline passed while queued"))
+                    continue
+
+                try:
+                    result = ticket.fn(*ticket.args)
+                except BaseException as e:
+                    ticket.future.set_exception(e)
+                    outcome = "failed"
+                else:
+                    ticket.future.set_result(result)
+                    outcome = "completed"
+
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    counts[outcome] += 1
+                    self._waits[ticket.priority].append(started - ticket.enqueued)
+                    if self._service_time is None:
+                        self._service_time = elapsed
+                    else:
+                        self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+            finally:
+                with self._cond:
+                    self._running -= 1
+
+    def cancel(self, future):
+        """Drop a queued request; running requests cannot be interrupted"""
+        with self._cond:
+            for priority, queue in self._queues.items():
+                for ticket in queue:
+                    if ticket.future is future:
+                        # Out of the queue at once, so it no longer counts toward
+                        # max_queue or the estimated wait of later requests
+                        queue.remove(ticket)
+                        self._counts[priority]["cancelled"] += 1
+                        return future.cancel()
+        return future.cancel()
+
+    def metrics(self):
+        """Queue depth, wait times and rejection counts per priority class"""
+        with self._cond:
+            classes = {}
+            for priority in PRIORITIES:
+                waits = sorted(self._waits[priority])
+
+                def wait_ms(q):
+                    if not waits:
+                        return 0.0
+                    return round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 1)
+
+                classes[priority] = dict(
+                    self._counts[priority],
+                    queue_depth=len(self._queues[priority]),
+                    queue_limit=self.max_queue[priority],
+                    wait_ms_p50=wait_ms(0.50),
+                    wait_ms_p95=wait_ms(0.95),
+                    wait_ms_max=wait_ms(1.0),
+                )
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "service_ms_avg": round((self._service_time or 0.0) * 1000, 1),
+                "classes": classes,
+            }
+
+    def shutdown(self, wait=True):
+        """Stop accepting work, drain the queues, then stop the workers"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
@@ -0,0 +1,68 @@
+import os
+import time
+import numpy as np
+
+# Per-session memory cap for prediction history, in KiB
+DEFAULT_MAX_KB = int(os.environ.get("BURNOUT_SESSION_HISTORY_KB", "64"))
+
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "f8"),
+    ("score", "f4"),
+    ("sentiment", "f4"),
+    ("screen", "f4"),
+    ("sleep", "f4"),
+    ("text_hash", "S64"),   # sha256 hex of the submitted text
+])
+
+
+class PredictionRing:
+    """Fixed-capacity ring buffer of a session's predictions
+
+    Backed by one preallocated structured array, so appends are O(1), the
+    memory per session is capped, and chart reads are plain column slices.
+    Once full, the oldest prediction is overwritten.
+    """
+
+    def __init__(self, capacity=None, max_kb=DEFAULT_MAX_KB):
+        if capacity is None:
+            capacity = max(1, (max_kb * 1024) // RECORD_DTYPE.itemsize)
+        self.data = np.zeros(capacity, dtype=RECORD_DTYPE)
+        self.total = 0
+
+    @property
+    def capacity(self):
+        return len(self.data)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, score, sentiment, screen, sleep, text_hash="", timestamp=None):
+        slot = self.total % self.capacity
+        self.data[slot] = (
+            time.time() if timestamp is None else timestamp,
+            score,
+            sentiment,
+            screen,
+            sleep,
+            text_hash.encode("ascii"),
+        )
+        self.total += 1
+
+    def view(self):
+        """Records oldest to newest (a copy once the buffer has wrapped)"""
+        if self.total <= self.capacity:
+            return self.data[:self.total]
+        split = self.total % self.capacity
+        return np.concatenate((self.data[split:], self.data[:split]))
+
+    def column(self, name):
+        return self.view()[name]
+
+    def latest(self):
+        if self.total == 0:
+            return None
+        return self.data[(self.total - 1) % self.capacity]
@@ -0,0 +1,200 @@
+"""Synthetic workplace survey rows with the same schema as the real export
+
+SurveyModel learns each column's empirical distribution plus a Gaussian
+copula (the correlation of the columns' normal scores) from the survey.
+Generating a chunk draws correlated normals, and each column maps them back
+through precomputed normal-score thresholds to one of its observed values,
+so marginals and key correlations are kept. BurnoutRisk is derived as in
+the survey (BurnoutLevel > 7) and EmployeeID continues past the source IDs.
+
+Chunks are independent (one seed each) and are written in parallel:
+    python -m synthetic data/survey_100m.csv --rows 100000000 --workers 8
+A .parquet output is a directory of part files (needs pyarrow).
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+import numpy as np
+
+SURVEY_PATH = "mental_health_workplace_survey.csv"
+ID_COLUMN = "EmployeeID"
+RISK_COLUMN = "BurnoutRisk"
+RISK_THRESHOLD = 7.0
+# Enough rows to estimate the copula; larger sources are sampled down
+FIT_MAX_ROWS = 200000
+
+_inv_cdf = np.vectorize(NormalDist().inv_cdf, otypes=[float])
+
+
+class SurveyModel:
+    """Empirical marginals plus a Gaussian copula over the survey columns"""
+
+    def __init__(self, columns, values, thresholds, cholesky, next_id):
+        self.columns = columns          # full schema, in file order
+        self.values = values            # column -> distinct observed values, sorted
+        self.thresholds = thresholds    # column -> normal-score cut points between values
+        self.cholesky = cholesky        # lower factor of the copula correlation
+        self.next_id = next_id
+        # CSV text of every value, so writing a row is string indexing and joins
+        self.labels = {
+            column: np.array([str(value.item() if hasattr(value, "item") else value) for value in observed],
+                             dtype=object)
+            for column, observed in values.items()
+        }
+
+    @classmethod
+    def fit(cls, path=SURVEY_PATH, max_rows=FIT_MAX_ROWS, seed=0):
+        import pandas as pd
+
+        df = pd.read_csv(path)
+        if len(df) > max_rows:
+            df = df.sample(max_rows, random_state=seed)
+
+        modeled = [column for column in df.columns if column not in (ID_COLUMN, RISK_COLUMN)]
+        values, thresholds, scores = {}, {}, []
+        for column in modeled:
+            series = df[column].dropna()
+            if series.dtype.kind in "biuf":
+                counts = series.value_counts().sort_index()
+                observed = counts.index.to_numpy()
+                ranks = df[column].rank(method="average").fillna(len(df) / 2).to_numpy()
+            else:
+                counts = series.astype(str).value_counts().sort_index()
+                observed = counts.index.to_numpy(dtype=object)
+                codes = pd.Categorical(df[column].astype(str), categories=observed).codes
+                ranks = pd.Series(codes).rank(method="average").to_numpy()
+            # Value i is drawn when the normal score falls between cut points i-1 and i
+            values[column] = observed
+            thresholds[column] = _inv_cdf(np.cumsum(counts.to_numpy())[:-1] / counts.sum())
+            scores.append(_inv_cdf((ranks - 0.5) / len(df)))
+
+        # Normal-score correlation, nudged to be positive definite
+        correlation = np.atleast_2d(np.corrcoef(np.array(scores)))
+        eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+        correlation = eigenvectors @ np.diag(np.maximum(eigenvalues, 1e-6)) @ eigenvectors.T
+        scale = np.sqrt(np.diag(correlation))
+        correlation = correlation / np.outer(scale, scale)
+
+        next_id = int(df[ID_COLUMN].max()) + 1 if ID_COLUMN in df.columns else 1
+        return cls(list(df.columns), values, thresholds, np.linalg.cholesky(correlation), next_id)
+
+    def draw(self, rows, seed=None):
+        """Column -> index into self.values for `rows` correlated draws"""
+        rng = np.random.default_rng(seed)
+        # One contiguous row of normals per column keeps the lookups cache-friendly
+        normals = self.cholesky @ rng.standard_normal((len(self.thresholds), rows))
+        return {
+            column: np.searchsorted(self.thresholds[column], normals[i])
+            for i, column in enumerate(self.thresholds)
+        }
+
+    def _risk(self, indexes):
+        return (self.values["BurnoutLevel"] > RISK_THRESHOLD).astype(np.int64)[indexes["BurnoutLevel"]]
+
+    def sample(self, rows, seed=None, first_id=None):
+        """DataFrame of `rows` synthetic survey rows"""
+        import pandas as pd
+
+        indexes = self.draw(rows, seed)
+        data = {}
+        for column, index in indexes.items():
+            observed = self.values[column]
+            if observed.dtype == object:
+                data[column] = pd.Categorical.from_codes(index, categories=observed)
+            else:
+                data[column] = observed[index]
+
+        if ID_COLUMN in self.columns:
+            first_id = self.next_id if first_id is None else first_id
+            data[ID_COLUMN] = np.arange(first_id, first_id + rows, dtype=np.int64)
+        if RISK_COLUMN in self.columns and "BurnoutLevel" in indexes:
+            data[RISK_COLUMN] = self._risk(indexes)
+        return pd.DataFrame(data, columns=self.columns)
+
+    def sample_csv(self, rows, seed=None, first_id=None):
+        """Same rows as sample(), as CSV text without a header"""
+        indexes = self.draw(rows, seed)
+        columns = []
+        for column in self.columns:
+            if column in indexes:
+                columns.append(self.labels[column][indexes[column]])
+            elif column == ID_COLUMN:
+                first_id = self.next_id if first_id is None else first_id
+                columns.append(map(str, range(first_id, first_id + rows)))
+            elif column == RISK_COLUMN and "BurnoutLevel" in indexes:
+                columns.append(np.array(["0", "1"], dtype=object)[self._risk(indexes)])
+            else:
+                columns.append([""] * rows)
+        return "".join(line + "\n" for line in map(",".join, zip(*columns)))
+
+
+def _write_chunk(model, rows, seed, first_id, path, fmt):
+    if fmt == "parquet":
+        model.sample(rows, seed, first_id).to_parquet(path, index=False)
+    else:
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(model.sample_csv(rows, seed, first_id))
+    return rows
+
+
+def generate(output, rows, model=None, chunk_rows=1000000, workers=None, seed=0, log=sys.stderr):
+    """Write `rows` synthetic rows to output (.csv file or .parquet directory)"""
+    model = model or SurveyModel.fit()
+    fmt = "parquet" if output.endswith(".parquet") else "csv"
+    if fmt == "parquet":
+        from importlib.util import find_spec
+        if find_spec("pyarrow") is None:
+            raise RuntimeError("Parquet output needs pyarrow: pip install pyarrow")
+
+    sizes = [min(chunk_rows, rows - start) for start in range(0, rows, chunk_rows)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    parts_dir = output if fmt == "parquet" else output + ".parts"
+    os.makedirs(parts_dir, exist_ok=True)
+    parts = [os.path.join(parts_dir, f"part-{i:05d}.{fmt}") for i in range(len(sizes))]
+
+    started = time.time()
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(_write_chunk, model, size, chunk_seed, model.next_id + sum(sizes[:i]), part, fmt)
+            for i, (size, chunk_seed, part) in enumerate(zip(sizes, seeds, parts))
+        ]
+        for future in futures:
+            done += future.result()
+            print(f"{done}/{rows} rows ({done / max(time.time() - started, 1e-9):.0f} rows/sec)", file=log)
+
+    if fmt == "csv":
+        # Parts have no header, so they concatenate into one file in order
+        tmp_path = output + ".tmp"
+        with open(tmp_path, "wb") as out:
+            out.write((",".join(model.columns) + "\n").encode("utf-8"))
+            for part in parts:
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out, 16 * 1024 * 1024)
+        os.replace(tmp_path, output)
+        shutil.rmtree(parts_dir)
+
+    print(f"Done: {rows} rows in {time.time() - started:.1f}s -> {output}", file=log)
+    return output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m synthetic", description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="Output .csv file or .parquet directory")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--source", default=SURVEY_PATH, help="Survey CSV to learn from")
+    parser.add_argument("--chunk-rows", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, default=None, help="Default: one per CPU")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    model = SurveyModel.fit(args.source, seed=args.seed)
+    generate(args.output, args.rows, model, args.chunk_rows, args.workers, args.seed)
+
+
+if __name__ == "__main__":
+    main()
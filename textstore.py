@@ -0,0 +1,65 @@
+"""Content-addressed storage for submitted texts
+
+Each unique text is stored once, under the sha256 of its UTF-8 bytes, at
+data/texts/<first two hex digits>/<hash>.txt. History rows keep only the
+hash, so storage grows with the number of unique texts, not submissions.
+"""
+import os
+import re
+import threading
+from utils import text_hash
+
+TEXTS_DIR = "data/texts"
+HASH_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class TextStore:
+    """Write-once text files addressed by their content hash"""
+
+    def __init__(self, root=TEXTS_DIR):
+        self.root = root
+
+    def path(self, digest):
+        if not HASH_PATTERN.fullmatch(digest or ""):
+            raise KeyError(digest)
+        return os.path.join(self.root, digest[:2], digest + ".txt")
+
+    def __contains__(self, digest):
+        try:
+            return os.path.exists(self.path(digest))
+        except KeyError:
+            return False
+
+    def put(self, text):
+        """Store text unless already present and return its hash"""
+        digest = text_hash(text)
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Same content under the same name, so concurrent writers can both replace
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest):
+        """Text stored under digest; KeyError if it is not stored"""
+        try:
+            with open(self.path(digest), encoding="utf-8", newline="") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise KeyError(digest) from None
+
+    def __iter__(self):
+        if not os.path.isdir(self.root):
+            return
+        for prefix in sorted(os.listdir(self.root)):
+            folder = os.path.join(self.root, prefix)
+            if os.path.isdir(folder):
+                for name in sorted(os.listdir(folder)):
+                    if name.endswith(".txt"):
+                        yield name[:-4]
+
+    def __len__(self):
+        return sum(1 for _ in self)
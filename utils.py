@@ -1,37 +1,412 @@
-import pandas as pd
+import atexit
+import csv
+import hashlib
+import io
 import os
+import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
-def save_record(text, screen, sleep, score):
-    """Save prediction record to CSV"""
-    os.makedirs("data", exist_ok=True)
+HISTORY_PATH = "data/history.csv"
+HISTORY_COLUMNS = ["date", "text_preview", "screen_hours", "sleep_hours", "burnout_score", "text_hash"]
+
+# How save_record persists (BURNOUT_HISTORY_DURABILITY):
+#   async - queued and appended in batches by a background thread (default)
+#   fsync - queued like async, but every batch is fsynced to disk
+#   sync  - appended and fsynced before save_record returns
+DURABILITY = os.environ.get("BURNOUT_HISTORY_DURABILITY", "async")
+
+_history_lock = threading.Lock()
+# Row count of the history file at a known inode and size, so appends don't re-read it
+_row_count = {"inode": None, "size": None, "rows": 0}
+
+def _count_records(f):
+    # CSV records, not lines: older files can hold quoted multi-line previews
+    return sum(1 for values in csv.reader(f) if values)
+
+def _history_rows(file_path):
+    """Number of data rows in the history file"""
+    if not os.path.exists(file_path):
+        return 0
+    stat = os.stat(file_path)
+    grew = _row_count["inode"] == stat.st_ino and stat.st_size >= (_row_count["size"] or 0)
+    if not grew or stat.st_size != _row_count["size"]:
+        with open(file_path, newline="", encoding="utf-8") as f:
+            if grew and _row_count["size"]:
+                # Same file, appended to: count only the new bytes
+                f.seek(_row_count["size"])
+                rows = _row_count["rows"] + _count_records(f)
+            else:
+                rows = max(_count_records(f) - 1, 0)
+        _row_count.update(inode=stat.st_ino, size=stat.st_size, rows=rows)
+    return _row_count["rows"]
+
+def _upgrade_history(file_path):
+    """Rewrite an older history file so its header has every column"""
+    with open(file_path, newline="", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    if not header or all(column in header for column in HISTORY_COLUMNS):
+        return
     
-    record = {
+    # Streamed with the csv module: this can run on the writer thread at exit
+    tmp_path = file_path + ".tmp"
+    with open(file_path, newline="", encoding="utf-8") as src, \
+            open(tmp_path, "w", newline="", encoding="utf-8") as dst:
+        writer = csv.DictWriter(dst, HISTORY_COLUMNS, restval="", extrasaction="ignore", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(csv.DictReader(src))
+    os.replace(tmp_path, file_path)
+
+def _make_record(text, screen, sleep, score):
+    # One line per record keeps the file append-only and easy to tail
+    preview = text.replace("\r", " ").replace("\n", " ")
+    return {
         "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "text_preview": text[:50] + "..." if len(text) > 50 else text,
+        "text_preview": preview[:50] + "..." if len(preview) > 50 else preview,
         "screen_hours": screen,
         "sleep_hours": sleep,
-        "burnout_score": score
+        "burnout_score": score,
+        # The full text is stored once by hash; the row only references it
+        "text_hash": text_hash(text)
     }
+
+def _write_records(items, fsync=False, on_written=None):
+    """Append (record, text, vector, risk) items to the history in one write
+
+    risk is (user, score, timestamp) for the user's streaming risk state,
+    updated once the rows are in the file.
+    """
+    from textstore import TextStore
+    os.makedirs("data", exist_ok=True)
+    
+    store = TextStore()
+    for _, text, _, _ in items:
+        store.put(text)
     
-    file_path = "data/history.csv"
+    file_path = HISTORY_PATH
     
-    if os.path.exists(file_path):
-        df = pd.read_csv(file_path)
-        df = pd.concat([df, pd.DataFrame([record])], ignore_index=True)
-    else:
-        df = pd.DataFrame([record])
+    with _history_lock:
+        if os.path.exists(file_path):
+            _upgrade_history(file_path)
+        row = _history_rows(file_path)
+        is_new = not os.path.exists(file_path) or os.path.getsize(file_path) == 0
+        
+        # Append instead of re-reading and rewriting the whole file
+        with open(file_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            if is_new:
+                writer.writerow(HISTORY_COLUMNS)
+            writer.writerows([record[column] for column in HISTORY_COLUMNS] for record, _, _, _ in items)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        stat = os.stat(file_path)
+        _row_count.update(inode=stat.st_ino, size=stat.st_size, rows=row + len(items))
+        
+        # Still under the lock, so readers never see a record twice or not at all
+        if on_written is not None:
+            on_written()
+        
+        # Keep each text embedding aligned with its history row
+        vectors = [(row + i, vector) for i, (_, _, vector, _) in enumerate(items) if vector is not None]
+        if vectors:
+            from embeddings import EmbeddingStore
+            store = EmbeddingStore()
+            for vector_row, vector in vectors:
+                store.append(vector, row=vector_row)
     
-    df.to_csv(file_path, index=False)
-    return True
+    # One detector transaction per batch, after the history lock is released.
+    # The rows are already written, so a failure here must not retry the batch
+    risk = [item for _, _, _, item in items if item is not None]
+    if risk:
+        from alerts import get_detector
+        try:
+            get_detector().update_many(risk)
+        except Exception as e:
+            print(f"Risk state update failed: {e}", file=sys.stderr)
+
+class HistoryWriter:
+    """Background thread that appends queued history records in batches
+
+    submit() only queues the record. The thread wakes on the first one,
+    lingers briefly so a burst shares one append, and writes up to
+    max_batch records at a time. Records stay in pending() until they are
+    in the file, so load_history can include them.
+    """
+    
+    def __init__(self, fsync=False, max_batch=256, linger=0.02):
+        self.fsync = fsync
+        self.max_batch = max_batch
+        self.linger = linger
+        self._queue = deque()
+        self._in_flight = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+        self.written = 0
+        self.batches = 0
+        self.errors = 0
+        self.flush_seconds_total = 0.0
+        self.flush_seconds_last = 0.0
+        self.flush_seconds_max = 0.0
+    
+    def submit(self, record, text, vector=None, risk=None):
+        """Queue a record; False once the writer is closed"""
+        with self._cond:
+            if self._closed:
+                return False
+            self._queue.append((record, text, vector, risk))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return True
+    
+    def _written(self):
+        with self._cond:
+            self.written += len(self._in_flight)
+            self._in_flight = []
+            self._cond.notify_all()
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._closed)
+                if not self._queue:
+                    return
+                if len(self._queue) < self.max_batch and not self._closed:
+                    self._cond.wait(self.linger)
+                count = min(len(self._queue), self.max_batch)
+                self._in_flight = [self._queue.popleft() for _ in range(count)]
+                batch = list(self._in_flight)
+            
+            started = time.perf_counter()
+            try:
+                _write_records(batch, fsync=self.fsync, on_written=self._written)
+            except Exception as e:
+                # Put the batch back in order and retry after a pause
+                print(f"History write failed, retrying: {e}", file=sys.stderr)
+                with self._cond:
+                    self.errors += 1
+                    self._queue.extendleft(reversed(self._in_flight))
+                    self._in_flight = []
+                time.sleep(1.0)
+                continue
+            
+            elapsed = time.perf_counter() - started
+            with self._cond:
+                self.batches += 1
+                self.flush_seconds_last = elapsed
+                self.flush_seconds_total += elapsed
+                self.flush_seconds_max = max(self.flush_seconds_max, elapsed)
+    
+    def pending(self):
+        """Records queued or being written, oldest first"""
+        with self._cond:
+            return [item[0] for item in self._in_flight] + [item[0] for item in self._queue]
+    
+    def flush(self, timeout=None):
+        """Wait until every queued record is written; False on timeout"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+    
+    def close(self, timeout=10.0):
+        """Write what is queued and stop the thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+    
+    def metrics(self):
+        with self._cond:
+            batches = max(self.batches, 1)
+            return {
+                "durability": "fsync" if self.fsync else "async",
+                "queue_length": len(self._queue) + len(self._in_flight),
+                "written": self.written,
+                "batches": self.batches,
+                "errors": self.errors,
+                "avg_batch_size": self.written / batches,
+                "flush_ms_last": 1000 * self.flush_seconds_last,
+                "flush_ms_avg": 1000 * self.flush_seconds_total / batches,
+                "flush_ms_max": 1000 * self.flush_seconds_max,
+            }
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_history_writer():
+    """Shared HistoryWriter, started on first use and flushed at exit"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = HistoryWriter(fsync=DURABILITY == "fsync")
+            atexit.register(_writer.close)
+    return _writer
+
+def _pending_records():
+    return _writer.pending() if _writer is not None else []
+
+def save_record(text, screen, sleep, score, vector=None, user_id=None):
+    """Save prediction record to CSV and the user's risk state
+
+    The risk update is applied with the history write, off the caller's
+    path; read the result with get_detector().status(user_id).
+    """
+    from alerts import DEFAULT_USER
+    record = _make_record(text, screen, sleep, score)
+    risk = (user_id or DEFAULT_USER, score, time.time())
+    
+    # Write-behind unless the caller must wait for the disk
+    if DURABILITY == "sync" or not get_history_writer().submit(record, text, vector, risk):
+        _write_records([(record, text, vector, risk)], fsync=DURABILITY != "async")
 
 def load_history():
-    """Load prediction history"""
-    file_path = "data/history.csv"
-    if os.path.exists(file_path):
+    """Load prediction history, including records not written yet"""
+    import pandas as pd
+    while True:
+        stat, pending = _history_snapshot()
+        if stat is None:
+            df = None
+            break
+        f = _open_snapshot(stat)
+        if f is None:
+            continue
+        # Parsed outside the lock, up to the snapshot size, so the writer is never held up
+        with f:
+            data = f.read(stat.st_size)
         try:
-            df = pd.read_csv(file_path)
-            return df
+            df = pd.read_csv(io.BytesIO(data))
         except:
-            return None
-    return None
\ No newline at end of file
+            df = None
+        break
+    
+    if pending:
+        pending_df = pd.DataFrame(pending, columns=HISTORY_COLUMNS)
+        df = pending_df if df is None else pd.concat([df, pending_df], ignore_index=True)
+    return df
+
+def _history_snapshot():
+    """(stat of the history file or None, pending records), taken together
+
+    The writer moves records from pending to the file under the history
+    lock, so the file's first st_size bytes plus pending hold every record
+    exactly once. Only this is done under the lock; callers read the file
+    after releasing it.
+    """
+    with _history_lock:
+        stat = os.stat(HISTORY_PATH) if os.path.exists(HISTORY_PATH) else None
+        return stat, _pending_records()
+
+def _open_snapshot(stat):
+    """Open the history file for reading, or None if it was replaced since stat"""
+    try:
+        f = open(HISTORY_PATH, "rb")
+    except FileNotFoundError:
+        return None
+    if os.fstat(f.fileno()).st_ino != stat.st_ino:
+        f.close()
+        return None
+    return f
+
+# Running totals of the history file up to a byte size, per inode
+_summary = {"inode": None, "size": 0, "column": None, "count": 0, "total": 0.0}
+_summary_lock = threading.Lock()
+
+def history_summary():
+    """Record count and mean score, folding in only rows appended since the last call"""
+    while True:
+        stat, pending = _history_snapshot()
+        with _summary_lock:
+            if stat is None or stat.st_ino != _summary["inode"] or stat.st_size < _summary["size"]:
+                _summary.update(inode=stat and stat.st_ino, size=0, column=None, count=0, total=0.0)
+            if stat is not None and stat.st_size > _summary["size"]:
+                f = _open_snapshot(stat)
+                if f is None:
+                    continue
+                with f:
+                    f.seek(_summary["size"])
+                    chunk = f.read(stat.st_size - _summary["size"])
+                # Stop at the last complete line; a record still being written
+                # by another process is read again by the next call
+                chunk = chunk[:chunk.rfind(b"\n") + 1]
+                rows = csv.reader(io.StringIO(chunk.decode("utf-8"), newline=""))
+                if _summary["column"] is None:
+                    header = next(rows, [])
+                    _summary["column"] = header.index("burnout_score") if "burnout_score" in header else None
+                if _summary["column"] is not None:
+                    for values in rows:
+                        try:
+                            _summary["total"] += float(values[_summary["column"]])
+                            _summary["count"] += 1
+                        except (IndexError, ValueError):
+                            continue
+                _summary["size"] += len(chunk)
+            count, total = _summary["count"], _summary["total"]
+        break
+    
+    for record in pending:
+        total += float(record["burnout_score"])
+        count += 1
+    return count, (total / count if count else 0.0)
+
+class HistoryTail:
+    """Follows the history CSV, returning only rows appended since the last poll
+
+    Reads from a byte offset up to the last complete line, so a record that
+    is still being written is picked up by the next poll instead of being
+    half-parsed. A file that shrank or was replaced is read again from the top.
+    """
+    
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self.reset()
+    
+    def reset(self):
+        self.offset = 0
+        self.header = None
+        self.inode = None
+        self.rows = 0
+    
+    def poll(self):
+        """(new rows as a DataFrame or None, whether the tail restarted)"""
+        import pandas as pd
+        if not os.path.exists(self.path):
+            restarted = self.rows > 0
+            self.reset()
+            return None, restarted
+        
+        stat = os.stat(self.path)
+        restarted = stat.st_size < self.offset or self.inode not in (None, stat.st_ino)
+        if restarted:
+            self.reset()
+        self.inode = stat.st_ino
+        if stat.st_size == self.offset:
+            return None, restarted
+        
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(stat.st_size - self.offset)
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return None, restarted
+        chunk = chunk[:end + 1]
+        self.offset += len(chunk)
+        
+        if self.header is None:
+            header_line, _, chunk = chunk.partition(b"\n")
+            self.header = next(csv.reader([header_line.decode("utf-8").strip()]))
+        if not chunk.strip():
+            return None, restarted
+        
+        new_rows = pd.read_csv(io.BytesIO(chunk), header=None, names=self.header)
+        self.rows += len(new_rows)
+        return new_rows, restarted
+
+def text_hash(text):
+    """Content hash used to reference a submitted text"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -0,0 +1,133 @@
+"""Memory-mapped BERT weights shared across server replicas
+
+A bundle is a directory holding the tokenizer files, config.json and a
+model.safetensors file with every parameter and buffer. Loading maps the
+safetensors file read-only and builds tensors directly on top of the
+mapping, so nothing is deserialized or copied: all processes on a host
+share one page-cache copy of the weights. Bundles load fully offline.
+
+Prepare once (needs the Hugging Face model, downloaded or cached):
+    python -m weights prepare data/bert-bundle
+Then run the app or API with BURNOUT_WEIGHTS_BUNDLE=data/bert-bundle.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import warnings
+import torch
+
+WEIGHTS_FILE = "model.safetensors"
+
+SAFETENSORS_DTYPES = {
+    "F64": torch.float64,
+    "F32": torch.float32,
+    "F16": torch.float16,
+    "BF16": torch.bfloat16,
+    "I64": torch.int64,
+    "I32": torch.int32,
+    "I16": torch.int16,
+    "I8": torch.int8,
+    "U8": torch.uint8,
+    "BOOL": torch.bool,
+}
+
+
+def prepare_bundle(out_dir, model_name="bert-base-uncased"):
+    """Write tokenizer, config and all tensors of a BertModel to out_dir"""
+    from safetensors.torch import save_file
+    from transformers import BertModel, BertTokenizer
+
+    tokenizer = BertTokenizer.from_pretrained(model_name)
+    model = BertModel.from_pretrained(model_name)
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer.save_pretrained(out_dir)
+    model.config.save_pretrained(out_dir)
+
+    # Buffers too, including non-persistent ones, so nothing is left to initialize
+    tensors = {name: t.detach().contiguous() for name, t in model.named_parameters()}
+    tensors.update({name: t.detach().contiguous() for name, t in model.named_buffers()})
+
+    tmp_path = os.path.join(out_dir, WEIGHTS_FILE + ".tmp")
+    save_file(tensors, tmp_path, metadata={"source": model_name})
+    os.replace(tmp_path, os.path.join(out_dir, WEIGHTS_FILE))
+    return out_dir
+
+
+def map_tensors(path):
+    """(tensors, mapping): read-only tensors backed by a safetensors memory map"""
+    with open(path, "rb") as f:
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    header_size = struct.unpack("<Q", mapping[:8])[0]
+    header = json.loads(mapping[8:8 + header_size])
+    data_start = 8 + header_size
+
+    tensors = {}
+    with warnings.catch_warnings():
+        # torch warns that the buffer is not writable; inference never writes
+        warnings.simplefilter("ignore", UserWarning)
+        for name, info in header.items():
+            if name == "__metadata__":
+                continue
+            dtype = SAFETENSORS_DTYPES[info["dtype"]]
+            start, end = info["data_offsets"]
+            count = (end - start) // torch.empty((), dtype=dtype).element_size()
+            if count == 0:
+                tensors[name] = torch.empty(info["shape"], dtype=dtype)
+                continue
+            flat = torch.frombuffer(mapping, dtype=dtype, count=count, offset=data_start + start)
+            tensors[name] = flat.reshape(info["shape"])
+    return tensors, mapping
+
+
+def load_bundle(bundle_dir):
+    """(tokenizer, model) from a prepared bundle, weights memory-mapped"""
+    from transformers import BertConfig, BertModel, BertTokenizer
+
+    tokenizer = BertTokenizer.from_pretrained(bundle_dir, local_files_only=True)
+    config = BertConfig.from_pretrained(bundle_dir, local_files_only=True)
+    tensors, mapping = map_tensors(os.path.join(bundle_dir, WEIGHTS_FILE))
+
+    # Build the module skeleton without allocating or initializing weights
+    with torch.device("meta"):
+        model = BertModel(config)
+
+    for name, tensor in tensors.items():
+        module_name, _, attr = name.rpartition(".")
+        module = model.get_submodule(module_name)
+        if attr in module._parameters:
+            module._parameters[attr] = torch.nn.Parameter(tensor, requires_grad=False)
+        else:
+            module._buffers[attr] = tensor
+
+    missing = [
+        name for name, t in list(model.named_parameters()) + list(model.named_buffers())
+        if t.is_meta
+    ]
+    if missing:
+        raise ValueError(f"Bundle {bundle_dir} is missing tensors: {', '.join(missing[:5])}")
+
+    # The tensors point into the mapping; keep it alive as long as the model
+    model._weights_mapping = mapping
+    model.eval()
+    return tokenizer, model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m weights")
+    commands = parser.add_subparsers(dest="command", required=True)
+    prepare = commands.add_parser("prepare", help="Write a memory-mappable weights bundle")
+    prepare.add_argument("out_dir")
+    prepare.add_argument("--model", default="bert-base-uncased")
+    args = parser.parse_args(argv)
+
+    if args.command == "prepare":
+        prepare_bundle(args.out_dir, args.model)
+        print(f"✅ Bundle written to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()